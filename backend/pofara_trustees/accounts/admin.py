@@ -11,17 +11,22 @@ from django.urls import reverse
 from .models import User, UserProfile, UserSession, LoginAttempt
 
 
+# Choice labels resolved once instead of per rendered cell
+_ROLE_DISPLAY = dict(User.Role.choices)
+_STATUS_DISPLAY = dict(User.Status.choices)
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     """Admin configuration for custom User model."""
     
     list_display = [
-        'username', 'email', 'get_full_name', 'role', 'status', 
+        'username', 'email', 'get_full_name', 'role_label', 'status_label', 
         'is_verified', 'phone_verified', 'email_verified', 
         'is_active', 'date_joined'
     ]
     list_filter = [
-        'role', 'status', 'is_active', 'email_verified', 
+        'role', 'status', 'is_active', 'is_verified', 'email_verified', 
         'phone_verified', 'two_factor_enabled', 'date_joined'
     ]
     search_fields = ['username', 'email', 'first_name', 'last_name', 'phone_number']
@@ -75,11 +80,33 @@ class UserAdmin(BaseUserAdmin):
     
     actions = ['activate_users', 'deactivate_users', 'verify_email', 'unlock_accounts']
     
+    def get_queryset(self, request):
+        """Load the profile alongside each user for the inline."""
+        return super().get_queryset(request).select_related('profile')
+    
+    def get_inlines(self, request, obj):
+        """Skip the profile inline when adding; the profile is created by signal."""
+        if obj is None:
+            return []
+        return super().get_inlines(request, obj)
+    
     def get_full_name(self, obj):
         """Display full name or username if no name provided."""
         return obj.get_full_name() or obj.username
     get_full_name.short_description = 'Full Name'
     
+    def role_label(self, obj):
+        """Display the role label from the precomputed choices map."""
+        return _ROLE_DISPLAY.get(obj.role, obj.role)
+    role_label.short_description = 'Role'
+    role_label.admin_order_field = 'role'
+    
+    def status_label(self, obj):
+        """Display the status label from the precomputed choices map."""
+        return _STATUS_DISPLAY.get(obj.status, obj.status)
+    status_label.short_description = 'Status'
+    status_label.admin_order_field = 'status'
+    
     def is_verified(self, obj):
         """Display verification status with colored indicator."""
         if obj.is_verified:
@@ -90,32 +117,35 @@ class UserAdmin(BaseUserAdmin):
             '<span style="color: red;">✗ Not Verified</span>'
         )
     is_verified.short_description = 'Verified'
+    is_verified.admin_order_field = 'is_verified'
     
     def activate_users(self, request, queryset):
         """Bulk action to activate selected users."""
-        count = queryset.update(status=User.Status.ACTIVE, is_active=True)
+        count = queryset.update(
+            status=User.Status.ACTIVE, is_active=True, updated_at=timezone.now()
+        )
         self.message_user(request, f'{count} users have been activated.')
     activate_users.short_description = 'Activate selected users'
     
     def deactivate_users(self, request, queryset):
         """Bulk action to deactivate selected users."""
-        count = queryset.update(status=User.Status.INACTIVE, is_active=False)
+        count = queryset.update(
+            status=User.Status.INACTIVE, is_active=False, updated_at=timezone.now()
+        )
         self.message_user(request, f'{count} users have been deactivated.')
     deactivate_users.short_description = 'Deactivate selected users'
     
     def verify_email(self, request, queryset):
         """Bulk action to verify email for selected users."""
-        count = queryset.update(email_verified=True)
+        count = queryset.update(email_verified=True, updated_at=timezone.now())
         self.message_user(request, f'Email verified for {count} users.')
     verify_email.short_description = 'Verify email for selected users'
     
     def unlock_accounts(self, request, queryset):
         """Bulk action to unlock selected user accounts."""
-        count = 0
-        for user in queryset:
-            if user.is_account_locked:
-                user.unlock_account()
-                count += 1
+        count = queryset.filter(account_locked_until__gt=timezone.now()).update(
+            account_locked_until=None, failed_login_attempts=0
+        )
         self.message_user(request, f'{count} user accounts have been unlocked.')
     unlock_accounts.short_description = 'Unlock selected accounts'
 
@@ -163,9 +193,14 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ['kyc_status', 'country', 'country_of_origin', 'gender']
     search_fields = [
         'user__username', 'user__email', 'user__first_name', 'user__last_name',
-        'country', 'city', 'country_of_origin'
+        'country', 'city', 'country_of_origin', 'full_address'
     ]
     readonly_fields = ['created_at', 'updated_at', 'kyc_completed_at']
+    list_select_related = ('user',)
+    
+    def get_queryset(self, request):
+        """Join the related user so its name is rendered without extra queries."""
+        return super().get_queryset(request).select_related('user')
     
     def is_kyc_completed(self, obj):
         """Display KYC completion status with colored indicator."""
@@ -190,6 +225,11 @@ class UserSessionAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'user__email', 'ip_address', 'session_key']
     readonly_fields = ['created_at', 'last_activity']
     ordering = ['-created_at']
+    list_select_related = ('user',)
+    
+    def get_queryset(self, request):
+        """Join the related user so its name is rendered without extra queries."""
+        return super().get_queryset(request).select_related('user')
     
     def has_add_permission(self, request):
         """Disable adding sessions through admin."""
@@ -215,6 +255,11 @@ class LoginAttemptAdmin(admin.ModelAdmin):
     search_fields = ['email', 'user__username', 'ip_address']
     readonly_fields = ['created_at']
     ordering = ['-created_at']
+    list_select_related = ('user',)
+    
+    def get_queryset(self, request):
+        """Join the related user so its name is rendered without extra queries."""
+        return super().get_queryset(request).select_related('user')
     
     def has_add_permission(self, request):
         """Disable adding login attempts through admin."""
@@ -0,0 +1,38 @@
+"""
+JWT authentication with cache-backed token revocation.
+
+Revoked token ids (jti) are kept in the default cache (Redis in
+production) until the token would have expired anyway, so checking a
+token never touches the database.
+"""
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication as BaseJWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+REVOKED_JTI_KEY = 'jti_bl:{}'
+
+
+def revoke_token(token):
+    """Revoke a token until its expiry time."""
+    remaining = int(token['exp'] - timezone.now().timestamp())
+    if remaining > 0:
+        cache.set(REVOKED_JTI_KEY.format(token[api_settings.JTI_CLAIM]), 1, timeout=remaining)
+
+
+def is_token_revoked(token):
+    """Check whether a token has been revoked."""
+    return cache.get(REVOKED_JTI_KEY.format(token[api_settings.JTI_CLAIM])) is not None
+
+
+class JWTAuthentication(BaseJWTAuthentication):
+    """JWTAuthentication that also rejects revoked access tokens."""
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_token_revoked(token):
+            raise InvalidToken('Token has been revoked.')
+        return token
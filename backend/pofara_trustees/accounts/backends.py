@@ -0,0 +1,35 @@
+"""
+Authentication backends for the accounts app.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticate with email and password in a single user lookup.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+
+        UserModel = get_user_model()
+        user = UserModel._default_manager.filter(email__iexact=email).first()
+
+        if user is None:
+            # Run the hasher anyway so unknown emails take as long as bad passwords
+            UserModel().set_password(password)
+            return None
+
+        # Locked or inactive accounts are rejected without running the hasher
+        if not self.user_can_authenticate(user):
+            return None
+
+        if user.check_password(password):
+            return user
+        return None
+
+    def user_can_authenticate(self, user):
+        return super().user_can_authenticate(user) and not user.is_account_locked
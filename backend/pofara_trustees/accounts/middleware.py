@@ -0,0 +1,54 @@
+"""
+Middleware for the accounts app.
+"""
+
+import ipaddress
+
+from django.conf import settings
+
+
+def _parse_ip(value):
+    try:
+        return ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+class ClientIPMiddleware:
+    """
+    Resolve the client IP address once per request as ``request.client_ip``.
+
+    X-Forwarded-For is client-controlled, so it is only read when
+    REMOTE_ADDR is one of settings.TRUSTED_PROXIES. The chain is then
+    walked from the right, skipping trusted proxies, and the first address
+    that isn't one is the client. Otherwise REMOTE_ADDR is the client.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES
+        ]
+
+    def is_trusted(self, address):
+        return any(address in network for network in self.trusted_proxies)
+
+    def client_ip(self, request):
+        remote_addr = request.META.get('REMOTE_ADDR')
+        address = _parse_ip(remote_addr or '')
+        if address is None or not self.is_trusted(address):
+            return remote_addr
+
+        for hop in reversed(request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')):
+            hop_address = _parse_ip(hop)
+            if hop_address is None:
+                # Garbage in the chain: don't trust anything left of it
+                break
+            address = hop_address
+            if not self.is_trusted(address):
+                break
+        return str(address)
+
+    def __call__(self, request):
+        request.client_ip = self.client_ip(request)
+        return self.get_response(request)
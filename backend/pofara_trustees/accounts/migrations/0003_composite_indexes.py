@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_email_ci_uniq'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='loginattempt',
+            name='login_attem_status_7d2f86_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='users_status_9ca66f_idx',
+        ),
+        migrations.AddIndex(
+            model_name='loginattempt',
+            index=models.Index(fields=['status', '-created_at'], name='login_attem_status_a49383_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginattempt',
+            index=models.Index(fields=['ip_address', 'status', '-created_at'], name='login_attem_ip_addr_251fc2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['status', 'is_active'], name='users_status_1462fc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['is_active', 'expires_at'], name='user_sessio_is_acti_51249a_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Trigram indexes backing the admin search boxes on PostgreSQL.
+#
+# Django compiles admin search (icontains) to UPPER("col"::text) LIKE UPPER(%s)
+# on PostgreSQL, so the indexes are built on that exact expression.
+
+from django.db import migrations
+
+from pofara_trustees.db import RunPostgresSQL
+
+
+USER_SEARCH_COLUMNS = ['username', 'email', 'first_name', 'last_name', 'phone_number']
+PROFILE_SEARCH_COLUMNS = ['country', 'city', 'country_of_origin']
+
+
+def trigram_index(table, column):
+    return RunPostgresSQL(
+        sql=(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm ON {table} '
+            f'USING gin ((UPPER({column}::text)) gin_trgm_ops);'
+        ),
+        reverse_sql=f'DROP INDEX IF EXISTS {table}_{column}_trgm;',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_composite_indexes'),
+    ]
+
+    operations = [
+        RunPostgresSQL(
+            sql='CREATE EXTENSION IF NOT EXISTS pg_trgm;',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        *[trigram_index('users', column) for column in USER_SEARCH_COLUMNS],
+        *[trigram_index('user_profiles', column) for column in PROFILE_SEARCH_COLUMNS],
+    ]
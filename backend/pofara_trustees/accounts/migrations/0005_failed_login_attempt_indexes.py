@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loginattempt',
+            index=models.Index(condition=models.Q(('status', 'failed')), fields=['email', 'created_at'], name='la_failed_email_ts'),
+        ),
+        migrations.AddIndex(
+            model_name='loginattempt',
+            index=models.Index(condition=models.Q(('status', 'failed')), fields=['ip_address', 'created_at'], name='la_failed_ip_ts'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:38
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from pofara_trustees.db import RunPostgresSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_failed_login_attempt_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='full_address',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Substr(django.db.models.functions.text.Concat(models.Case(models.When(models.Q(('address', ''), _negated=True), then=django.db.models.functions.text.Concat(models.Value(', '), 'address')), default=models.Value(''), output_field=models.TextField()), models.Case(models.When(models.Q(('city', ''), _negated=True), then=django.db.models.functions.text.Concat(models.Value(', '), 'city')), default=models.Value(''), output_field=models.TextField()), models.Case(models.When(models.Q(('country', ''), _negated=True), then=django.db.models.functions.text.Concat(models.Value(', '), 'country')), default=models.Value(''), output_field=models.TextField()), models.Case(models.When(models.Q(('postal_code', ''), _negated=True), then=django.db.models.functions.text.Concat(models.Value(', '), 'postal_code')), default=models.Value(''), output_field=models.TextField())), 3), output_field=models.TextField()),
+        ),
+        RunPostgresSQL(
+            sql=(
+                'CREATE INDEX IF NOT EXISTS user_profiles_full_address_trgm ON user_profiles '
+                'USING gin ((UPPER(full_address::text)) gin_trgm_ops);'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS user_profiles_full_address_trgm;',
+        ),
+    ]
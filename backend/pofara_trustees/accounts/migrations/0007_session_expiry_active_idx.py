@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_profile_full_address'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['expires_at'], include=('user',), name='session_expiry_active_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_session_expiry_active_idx'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='is_verified',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('email_verified', True), models.Q(('phone_verified', True), ('phone_number__isnull', True), ('phone_number', ''), _connector='OR')), then=models.Value(True)), default=models.Value(False), output_field=models.BooleanField()), output_field=models.BooleanField()),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_verified'], name='users_is_veri_63cd6e_idx'),
+        ),
+    ]
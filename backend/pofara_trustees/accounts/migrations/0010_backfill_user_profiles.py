@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:50
+
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    db_alias = schema_editor.connection.alias
+
+    missing = User.objects.using(db_alias).filter(profile__isnull=True).values_list('pk', flat=True)
+    UserProfile.objects.using(db_alias).bulk_create(
+        [UserProfile(user_id=pk) for pk in missing.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_login_attempt_created_at_default'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
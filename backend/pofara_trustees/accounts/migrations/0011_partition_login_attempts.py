@@ -0,0 +1,26 @@
+# Range-partition login_attempts by month on PostgreSQL so expired months
+# can be dropped whole instead of bulk-deleted. Partitions ahead of time and
+# retention are handled by accounts.tasks.maintain_login_attempt_partitions.
+
+from django.db import migrations
+
+from pofara_trustees.db import partition_table_by_month, unpartition_table
+
+
+def partition_login_attempts(apps, schema_editor):
+    partition_table_by_month(schema_editor, 'login_attempts', 'created_at')
+
+
+def unpartition_login_attempts(apps, schema_editor):
+    unpartition_table(schema_editor, 'login_attempts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_backfill_user_profiles'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_login_attempts, unpartition_login_attempts),
+    ]
@@ -4,10 +4,12 @@ Includes custom user model, profiles, and role-based access control.
 """
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Concat, Substr, Upper
 from django.core.validators import RegexValidator
 from phonenumber_field.modelfields import PhoneNumberField
 from django.utils import timezone
+from django.utils.functional import cached_property
 import uuid
 
 
@@ -38,6 +40,23 @@ class User(AbstractUser):
     phone_number = PhoneNumberField(blank=True, null=True, help_text="Phone number with country code")
     phone_verified = models.BooleanField(default=False)
     email_verified = models.BooleanField(default=False)
+    # Basic verification: email, plus phone when a number is on file
+    is_verified = models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                models.Q(email_verified=True) & (
+                    models.Q(phone_verified=True)
+                    | models.Q(phone_number__isnull=True)
+                    | models.Q(phone_number='')
+                ),
+                then=models.Value(True),
+            ),
+            default=models.Value(False),
+            output_field=models.BooleanField(),
+        ),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
     
     # Security and tracking
     last_login_ip = models.GenericIPAddressField(blank=True, null=True)
@@ -62,25 +81,30 @@ class User(AbstractUser):
         indexes = [
             models.Index(fields=['email']),
             models.Index(fields=['role']),
-            models.Index(fields=['status']),
+            models.Index(fields=['status', 'is_active']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['is_verified']),
+        ]
+        constraints = [
+            # Case-insensitive uniqueness; UPPER matches how Django compiles
+            # email__iexact on PostgreSQL so lookups can use this index.
+            models.UniqueConstraint(
+                Upper('email'),
+                condition=~models.Q(email=''),
+                name='user_email_ci_uniq',
+            ),
         ]
     
     def __str__(self):
         return f"{self.get_full_name() or self.username} ({self.get_role_display()})"
     
-    @property
+    @cached_property
     def is_account_locked(self):
         """Check if account is currently locked due to failed login attempts."""
         if self.account_locked_until:
             return timezone.now() < self.account_locked_until
         return False
     
-    @property
-    def is_verified(self):
-        """Check if user has completed basic verification (email and phone)."""
-        return self.email_verified and (self.phone_verified or not self.phone_number)
-    
     def can_login(self):
         """Check if user is allowed to login."""
         return (
@@ -92,14 +116,47 @@ class User(AbstractUser):
     
     def lock_account(self, duration_minutes=30):
         """Lock account for specified duration after failed login attempts."""
-        self.account_locked_until = timezone.now() + timezone.timedelta(minutes=duration_minutes)
-        self.save(update_fields=['account_locked_until'])
+        locked_until = timezone.now() + timezone.timedelta(minutes=duration_minutes)
+        type(self).objects.filter(pk=self.pk).update(account_locked_until=locked_until)
+        self.account_locked_until = locked_until
+        self.__dict__.pop('is_account_locked', None)
     
     def unlock_account(self):
         """Unlock account and reset failed login attempts."""
+        type(self).objects.filter(pk=self.pk).update(account_locked_until=None, failed_login_attempts=0)
         self.account_locked_until = None
         self.failed_login_attempts = 0
-        self.save(update_fields=['account_locked_until', 'failed_login_attempts'])
+        self.__dict__.pop('is_account_locked', None)
+    
+    @classmethod
+    def create_with_profile_bulk(cls, rows, batch_size=1000):
+        """
+        Create many users with their profiles in a few batched INSERTs.
+        
+        Each row is a dict of User field values plus an optional 'password';
+        the email doubles as the username when none is given, as in
+        registration. Returns the created users.
+        """
+        users = []
+        for row in rows:
+            row = dict(row)
+            password = row.pop('password', None)
+            row['email'] = cls.objects.normalize_email(row.get('email', ''))
+            row.setdefault('username', row['email'])
+            user = cls(**row)
+            if password:
+                user.set_password(password)
+            else:
+                user.set_unusable_password()
+            users.append(user)
+        
+        with transaction.atomic():
+            cls.objects.bulk_create(users, batch_size=batch_size)
+            UserProfile.objects.bulk_create(
+                [UserProfile(user=user) for user in users],
+                batch_size=batch_size,
+            )
+        return users
 
 
 class UserProfile(models.Model):
@@ -128,6 +185,22 @@ class UserProfile(models.Model):
     city = models.CharField(max_length=100, blank=True, help_text="City of residence")
     address = models.TextField(blank=True, help_text="Full address")
     postal_code = models.CharField(max_length=20, blank=True)
+    full_address = models.GeneratedField(
+        # ", "-join of the non-empty parts; Substr drops the leading separator.
+        expression=Substr(
+            Concat(*[
+                models.Case(
+                    models.When(~models.Q(**{part: ''}), then=Concat(models.Value(', '), part)),
+                    default=models.Value(''),
+                    output_field=models.TextField(),
+                )
+                for part in ('address', 'city', 'country', 'postal_code')
+            ]),
+            3,
+        ),
+        output_field=models.TextField(),
+        db_persist=True,
+    )
     
     # African diaspora specific information
     country_of_origin = models.CharField(max_length=100, blank=True, help_text="African country of origin")
@@ -186,17 +259,6 @@ class UserProfile(models.Model):
     def is_kyc_completed(self):
         """Check if KYC verification is completed."""
         return self.kyc_status == 'approved'
-    
-    @property
-    def full_address(self):
-        """Return formatted full address."""
-        address_parts = [
-            self.address,
-            self.city,
-            self.country,
-            self.postal_code
-        ]
-        return ', '.join(filter(None, address_parts))
 
 
 class UserSession(models.Model):
@@ -223,17 +285,31 @@ class UserSession(models.Model):
         verbose_name_plural = 'User Sessions'
         indexes = [
             models.Index(fields=['user', 'is_active']),
+            models.Index(fields=['is_active', 'expires_at']),
             models.Index(fields=['expires_at']),
             models.Index(fields=['ip_address']),
+            # Covers the expiry sweep so it can run as an index-only scan
+            models.Index(
+                fields=['expires_at'],
+                include=['user'],
+                condition=models.Q(is_active=True),
+                name='session_expiry_active_idx',
+            ),
         ]
     
     def __str__(self):
-        return f"Session for {self.user.username} from {self.ip_address}"
+        # user_id avoids fetching the user just to render the session
+        return f"Session {self.session_key[:8]} for user {self.user_id} from {self.ip_address}"
     
     @property
     def is_expired(self):
         """Check if session is expired."""
         return timezone.now() > self.expires_at
+    
+    @classmethod
+    def deactivate_expired(cls):
+        """Deactivate all expired sessions in one UPDATE; returns the row count."""
+        return cls.objects.filter(is_active=True, expires_at__lt=timezone.now()).update(is_active=False)
 
 
 class LoginAttempt(models.Model):
@@ -253,7 +329,8 @@ class LoginAttempt(models.Model):
     status = models.CharField(max_length=10, choices=Status.choices)
     failure_reason = models.CharField(max_length=100, blank=True)
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set explicitly when attempts are buffered and inserted later in bulk
+    created_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         db_table = 'login_attempts'
@@ -262,7 +339,19 @@ class LoginAttempt(models.Model):
         indexes = [
             models.Index(fields=['email', 'created_at']),
             models.Index(fields=['ip_address', 'created_at']),
-            models.Index(fields=['status']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['ip_address', 'status', '-created_at']),
+            # Partial indexes for failed-attempt counts in the rate checks
+            models.Index(
+                fields=['email', 'created_at'],
+                name='la_failed_email_ts',
+                condition=models.Q(status='failed'),
+            ),
+            models.Index(
+                fields=['ip_address', 'created_at'],
+                name='la_failed_ip_ts',
+                condition=models.Q(status='failed'),
+            ),
         ]
     
     def __str__(self):
@@ -4,16 +4,25 @@ Serializers for the accounts app.
 
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.core.cache import cache
 from django.contrib.auth.password_validation import validate_password
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+    TokenVerifySerializer as BaseTokenVerifySerializer,
+)
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from .authentication import is_token_revoked
 from .models import User, UserProfile
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serializer for user registration."""
     
-    password = serializers.CharField(write_only=True, validators=[validate_password])
-    password_confirm = serializers.CharField(write_only=True)
+    password = serializers.CharField(write_only=True, trim_whitespace=False)
+    password_confirm = serializers.CharField(write_only=True, trim_whitespace=False, validators=[])
     
     class Meta:
         model = User
@@ -30,10 +39,17 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         if attrs['password'] != attrs['password_confirm']:
             raise serializers.ValidationError("Passwords don't match.")
+        
+        # Run the password validators once, and only when the passwords match
+        try:
+            validate_password(attrs['password'])
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({'password': list(e.messages)})
         return attrs
     
     def validate_email(self, value):
-        if User.objects.filter(email__iexact=value).exists():
+        # Excluding blank emails lets the planner use the partial unique index
+        if User.objects.filter(email__iexact=value).exclude(email='').exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return value.lower()
     
@@ -41,17 +57,20 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
         
-        # Create user
-        user = User.objects.create_user(
-            username=validated_data['email'],  # Use email as username
-            **validated_data
-        )
-        user.set_password(password)
-        user.terms_accepted = True  # Assume terms are accepted during registration
-        user.save()
-        
-        # Create user profile
-        UserProfile.objects.create(user=user)
+        try:
+            with transaction.atomic():
+                # Create user; create_user hashes the password before the INSERT
+                # and the post_save signal adds the profile
+                user = User.objects.create_user(
+                    username=validated_data['email'],  # Use email as username
+                    password=password,
+                    terms_accepted=True,  # Assume terms are accepted during registration
+                    status=User.Status.ACTIVE,  # Active from the initial INSERT
+                    **validated_data
+                )
+        except IntegrityError:
+            # Lost a race with a concurrent signup for the same email
+            raise serializers.ValidationError({'email': ["A user with this email already exists."]})
         
         return user
 
@@ -61,6 +80,8 @@ class UserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
+        # Only columns of the users table, so serializing a freshly saved or
+        # authenticated user never triggers related-object queries.
         fields = [
             'id', 'email', 'first_name', 'last_name', 'phone_number',
             'role', 'status', 'email_verified', 'phone_verified',
@@ -70,6 +91,31 @@ class UserSerializer(serializers.ModelSerializer):
             'id', 'role', 'status', 'email_verified', 'phone_verified',
             'is_verified', 'created_at', 'updated_at'
         ]
+    
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        # is_verified is computed by the database; reload it after the write
+        instance.refresh_from_db(fields=['is_verified'])
+        return instance
+
+
+USER_DATA_CACHE_KEY = 'user_ser:{}:{}'
+USER_DATA_CACHE_TIMEOUT = 60
+
+
+def serialize_user(user):
+    """
+    Return UserSerializer data for a user, cached briefly.
+
+    The cache key includes updated_at, so any save of the user moves to a
+    new key instead of serving stale data.
+    """
+    key = USER_DATA_CACHE_KEY.format(user.pk, user.updated_at.timestamp())
+    data = cache.get(key)
+    if data is None:
+        data = dict(UserSerializer(user).data)
+        cache.set(key, data, USER_DATA_CACHE_TIMEOUT)
+    return data
 
 
 class AuthResponseSerializer(serializers.Serializer):
@@ -91,14 +137,9 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
         
         if email and password:
-            # Try to get user by email
-            try:
-                user = User.objects.get(email__iexact=email)
-            except User.DoesNotExist:
-                raise serializers.ValidationError('Invalid credentials.')
-            
-            # Authenticate user
-            user = authenticate(username=user.username, password=password)
+            user = authenticate(
+                request=self.context.get('request'), email=email, password=password
+            )
             
             if not user:
                 raise serializers.ValidationError('Invalid credentials.')
@@ -144,4 +185,32 @@ class ChangePasswordSerializer(serializers.Serializer):
         user = self.context['request'].user
         if not user.check_password(value):
             raise serializers.ValidationError("Old password is incorrect.")
-        return value 
\ No newline at end of file
+        return value 
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Token refresh that refuses refresh tokens revoked at logout."""
+    
+    def validate(self, attrs):
+        try:
+            refresh = RefreshToken(attrs['refresh'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        
+        if is_token_revoked(refresh):
+            raise InvalidToken('Token has been revoked.')
+        return super().validate(attrs)
+
+
+class TokenVerifySerializer(BaseTokenVerifySerializer):
+    """Token verification that reports revoked tokens as invalid."""
+    
+    def validate(self, attrs):
+        try:
+            token = UntypedToken(attrs['token'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        
+        if is_token_revoked(token):
+            raise InvalidToken('Token has been revoked.')
+        return super().validate(attrs)
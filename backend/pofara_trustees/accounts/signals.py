@@ -0,0 +1,15 @@
+"""
+Signal handlers for the accounts app.
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import User, UserProfile
+
+
+@receiver(post_save, sender=User)
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    """Give every new user an empty profile."""
+    if created and not raw:
+        UserProfile.objects.create(user=instance)
@@ -0,0 +1,99 @@
+"""
+Celery tasks for the accounts app.
+"""
+
+import json
+from datetime import timedelta
+
+from celery import shared_task
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+from redis.exceptions import ResponseError
+
+from pofara_trustees.db import create_monthly_partitions, drop_monthly_partitions_before
+
+from .models import LoginAttempt, User
+
+
+LOGIN_ATTEMPT_BUFFER_KEY = 'login_attempts:buf'
+LOGIN_ATTEMPT_PROCESSING_KEY = 'login_attempts:processing'
+LOGIN_ATTEMPT_RETENTION_DAYS = 90
+LOGIN_ATTEMPT_PARTITIONS_AHEAD = 3
+
+
+@shared_task(ignore_result=True)
+def log_login_attempt(payload):
+    """
+    Buffer a login attempt in Redis for the next batched insert.
+
+    The payload holds LoginAttempt field values (user_id rather than the
+    user) plus an ISO-formatted created_at. Without a Redis cache the
+    attempt is written straight away.
+    """
+    try:
+        redis = get_redis_connection('default')
+    except NotImplementedError:
+        payload = dict(payload, created_at=parse_datetime(payload['created_at']))
+        LoginAttempt.objects.create(**payload)
+        return
+    redis.lpush(LOGIN_ATTEMPT_BUFFER_KEY, json.dumps(payload))
+
+
+@shared_task(ignore_result=True)
+def flush_login_attempts():
+    """
+    Drain the login attempt buffer into the database in bulk.
+
+    The buffer is renamed to a processing list, which is only deleted once
+    the insert has committed. If the insert fails the batch stays there
+    and is retried by the next run, ahead of anything buffered since.
+    """
+    try:
+        redis = get_redis_connection('default')
+    except NotImplementedError:
+        return 0
+
+    # RENAMENX is atomic, so concurrent pushes land in a fresh buffer; a
+    # processing list left by a failed run is retried first
+    if not redis.exists(LOGIN_ATTEMPT_PROCESSING_KEY):
+        try:
+            redis.renamenx(LOGIN_ATTEMPT_BUFFER_KEY, LOGIN_ATTEMPT_PROCESSING_KEY)
+        except ResponseError:
+            # Nothing buffered
+            return 0
+    raw_attempts = redis.lrange(LOGIN_ATTEMPT_PROCESSING_KEY, 0, -1)
+
+    attempts = []
+    # LPUSH stores newest first; insert in arrival order
+    for raw in reversed(raw_attempts):
+        data = json.loads(raw)
+        data['created_at'] = parse_datetime(data['created_at'])
+        attempts.append(LoginAttempt(**data))
+
+    # Users deleted since their attempt was buffered would fail the FK
+    user_ids = {attempt.user_id for attempt in attempts if attempt.user_id}
+    existing = set(map(str, User.objects.filter(pk__in=user_ids).values_list('pk', flat=True)))
+    for attempt in attempts:
+        if attempt.user_id and str(attempt.user_id) not in existing:
+            attempt.user_id = None
+
+    with transaction.atomic():
+        LoginAttempt.objects.bulk_create(attempts, batch_size=5000, ignore_conflicts=True)
+    redis.delete(LOGIN_ATTEMPT_PROCESSING_KEY)
+    return len(attempts)
+
+
+@shared_task(ignore_result=True)
+def maintain_login_attempt_partitions():
+    """
+    Keep the monthly login_attempts partitions ahead of time and drop the
+    ones past the retention window (PostgreSQL only).
+    """
+    table = LoginAttempt._meta.db_table
+    today = timezone.now().date()
+    create_monthly_partitions(connection, table, today, LOGIN_ATTEMPT_PARTITIONS_AHEAD + 1)
+    return drop_monthly_partitions_before(
+        connection, table, today - timedelta(days=LOGIN_ATTEMPT_RETENTION_DAYS)
+    )
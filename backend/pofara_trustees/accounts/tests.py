@@ -1,3 +1,160 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from redis.exceptions import ResponseError
+
+from .middleware import ClientIPMiddleware
+from .models import LoginAttempt, User
+from .tasks import LOGIN_ATTEMPT_BUFFER_KEY, LOGIN_ATTEMPT_PROCESSING_KEY, flush_login_attempts, log_login_attempt
+
+
+class ClientIPMiddlewareTests(SimpleTestCase):
+    def resolve(self, remote_addr, forwarded_for=None):
+        meta = {'REMOTE_ADDR': remote_addr}
+        if forwarded_for is not None:
+            meta['HTTP_X_FORWARDED_FOR'] = forwarded_for
+        request = RequestFactory().get('/', **meta)
+        ClientIPMiddleware(lambda request: HttpResponse())(request)
+        return request.client_ip
+
+    @override_settings(TRUSTED_PROXIES=[])
+    def test_forwarded_for_ignored_without_trusted_proxies(self):
+        self.assertEqual(self.resolve('203.0.113.7', '198.51.100.1'), '203.0.113.7')
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_forwarded_for_ignored_from_untrusted_peer(self):
+        self.assertEqual(self.resolve('203.0.113.7', '198.51.100.1'), '203.0.113.7')
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_right_most_untrusted_hop_is_the_client(self):
+        # The client prepended a spoofed address; the proxies appended the real one
+        self.assertEqual(self.resolve('10.0.0.2', '1.2.3.4, 198.51.100.9, 10.0.0.1'), '198.51.100.9')
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_garbage_hop_stops_the_walk(self):
+        self.assertEqual(self.resolve('10.0.0.2', '198.51.100.9, not-an-ip'), '10.0.0.2')
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_trusted_peer_without_forwarded_for(self):
+        self.assertEqual(self.resolve('10.0.0.2'), '10.0.0.2')
+
+
+@override_settings(RATELIMIT_ENABLE=True, TRUSTED_PROXIES=[])
+class LoginRateLimitTests(TestCase):
+    url = '/api/v1/auth/token/'
+
+    def setUp(self):
+        cache.clear()
+        # Keep every attempt in one rate window so a boundary mid-test can't reset the counts
+        patcher = mock.patch('django_ratelimit.core._get_window', return_value=int(time.time()) + 60)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, email, remote_addr='203.0.113.7', **extra):
+        return self.client.post(
+            self.url, {'email': email, 'password': 'wrong'},
+            content_type='application/json', REMOTE_ADDR=remote_addr, **extra
+        )
+
+    def test_rotating_forwarded_for_does_not_reset_the_ip_limit(self):
+        for attempt in range(20):
+            response = self.login(f'user{attempt}@example.com', HTTP_X_FORWARDED_FOR=f'198.51.100.{attempt}')
+            self.assertEqual(response.status_code, 400)
+        response = self.login('other@example.com', HTTP_X_FORWARDED_FOR='198.51.100.99')
+        self.assertEqual(response.status_code, 429)
+
+    def test_body_that_is_not_an_object_is_a_bad_request(self):
+        for body in ('[]', '"user@example.com"'):
+            response = self.client.post(self.url, body, content_type='application/json', REMOTE_ADDR='203.0.113.7')
+            self.assertEqual(response.status_code, 400)
+
+    def test_rotating_ips_does_not_reset_the_email_limit(self):
+        for attempt in range(10):
+            self.assertEqual(self.login('Target@example.com', f'198.51.100.{attempt}').status_code, 400)
+        self.assertEqual(self.login('target@example.com ', '198.51.100.99').status_code, 429)
+
+
+class FakeRedis:
+    """The few list commands the login attempt buffer uses."""
+
+    def __init__(self):
+        self.lists = {}
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def exists(self, key):
+        return int(key in self.lists)
+
+    def renamenx(self, source, destination):
+        if source not in self.lists:
+            raise ResponseError('no such key')
+        if destination in self.lists:
+            return False
+        self.lists[destination] = self.lists.pop(source)
+        return True
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+
+class LoginAttemptBufferTests(TestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch('accounts.tasks.get_redis_connection', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username='buffered', email='buffered@example.com', password='x')
+
+    def log(self, email, user=None):
+        log_login_attempt({
+            'user_id': str(user.pk) if user else None,
+            'email': email,
+            'ip_address': '203.0.113.7',
+            'status': LoginAttempt.Status.FAILED,
+            'created_at': timezone.now().isoformat(),
+        })
+
+    def test_round_trip_in_arrival_order(self):
+        for number in range(3):
+            self.log(f'user{number}@example.com', self.user)
+        self.assertEqual(LoginAttempt.objects.count(), 0)
+
+        self.assertEqual(flush_login_attempts(), 3)
+        self.assertEqual(
+            list(LoginAttempt.objects.order_by('pk').values_list('email', flat=True)),
+            ['user0@example.com', 'user1@example.com', 'user2@example.com'],
+        )
+        self.assertEqual(self.redis.lists, {})
+        self.assertEqual(flush_login_attempts(), 0)
+
+    def test_failed_insert_keeps_the_batch_for_the_next_run(self):
+        self.log('first@example.com')
+        with mock.patch.object(LoginAttempt.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                flush_login_attempts()
+        self.assertEqual(len(self.redis.lists[LOGIN_ATTEMPT_PROCESSING_KEY]), 1)
+
+        # Attempts logged meanwhile wait in the buffer for the run after
+        self.log('second@example.com')
+        self.assertEqual(flush_login_attempts(), 1)
+        self.assertEqual(len(self.redis.lists[LOGIN_ATTEMPT_BUFFER_KEY]), 1)
+        self.assertEqual(flush_login_attempts(), 1)
+        self.assertEqual(
+            sorted(LoginAttempt.objects.values_list('email', flat=True)),
+            ['first@example.com', 'second@example.com'],
+        )
+
+    def test_attempts_of_deleted_users_are_kept_without_the_user(self):
+        gone = User.objects.create_user(username='gone', email='gone@example.com', password='x')
+        self.log('gone@example.com', gone)
+        gone.delete()
+        self.assertEqual(flush_login_attempts(), 1)
+        self.assertIsNone(LoginAttempt.objects.get().user_id)
@@ -8,9 +8,15 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth import login
+from django.db.models import F, Q
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django_ratelimit.decorators import ratelimit
+from datetime import timedelta
 
+from .authentication import revoke_token
 from .models import User, UserProfile, LoginAttempt
+from .tasks import log_login_attempt
 from .serializers import (
     UserRegistrationSerializer,
     UserSerializer,
@@ -18,6 +24,7 @@ from .serializers import (
     AuthResponseSerializer,
     UserProfileSerializer,
     ChangePasswordSerializer,
+    serialize_user,
 )
 
 
@@ -35,45 +42,61 @@ class UserRegistrationView(generics.CreateAPIView):
             # Generate JWT tokens
             refresh = RefreshToken.for_user(user)
             
-            # Update user status to active after successful registration
-            user.status = User.Status.ACTIVE
-            user.save()
-            
             # Log successful registration attempt
-            LoginAttempt.objects.create(
-                user=user,
-                email=user.email,
-                ip_address=self.get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                status=LoginAttempt.Status.SUCCESS
-            )
+            log_login_attempt.delay({
+                'user_id': str(user.id),
+                'email': user.email,
+                'ip_address': request.client_ip,
+                'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+                'status': LoginAttempt.Status.SUCCESS,
+                'created_at': timezone.now().isoformat(),
+            })
             
             response_data = {
                 'access': str(refresh.access_token),
                 'refresh': str(refresh),
-                'user': UserSerializer(user).data
+                'user': serialize_user(user)
             }
             
             return Response(response_data, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
-    def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
 
 
+def client_ip_key(group, request):
+    """Rate limit key: the client IP resolved by ClientIPMiddleware."""
+    return request.client_ip
+
+
+def login_email_key(group, request):
+    """Rate limit key: the email being logged into, whatever IP it comes from."""
+    # Runs before the view validates anything, so the body may not be an object
+    data = request.data if isinstance(request.data, dict) else {}
+    return str(data.get('email', '')).strip().lower()
+
+
+@method_decorator(
+    ratelimit(group='login', key=client_ip_key, rate='20/m', method='POST', block=False),
+    name='post',
+)
+@method_decorator(
+    ratelimit(group='login_email', key=login_email_key, rate='10/m', method='POST', block=False),
+    name='post',
+)
 class CustomLoginView(APIView):
     """Custom login view with JWT token generation."""
     
     permission_classes = [permissions.AllowAny]
     
     def post(self, request):
-        serializer = LoginSerializer(data=request.data)
+        # Over the per-IP or per-email limit: reject before authenticating or logging anything
+        if getattr(request, 'limited', False):
+            return Response(
+                {'error': 'Too many login attempts. Please try again later.'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+        
+        serializer = LoginSerializer(data=request.data, context={'request': request})
         
         if serializer.is_valid():
             user = serializer.validated_data['user']
@@ -81,72 +104,70 @@ class CustomLoginView(APIView):
             # Reset failed login attempts on successful login
             user.failed_login_attempts = 0
             user.last_login = timezone.now()
-            user.last_login_ip = self.get_client_ip(request)
+            user.last_login_ip = request.client_ip
             user.save(update_fields=['failed_login_attempts', 'last_login', 'last_login_ip'])
             
             # Generate JWT tokens
             refresh = RefreshToken.for_user(user)
             
             # Log successful login attempt
-            LoginAttempt.objects.create(
-                user=user,
-                email=user.email,
-                ip_address=self.get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                status=LoginAttempt.Status.SUCCESS
-            )
+            log_login_attempt.delay({
+                'user_id': str(user.id),
+                'email': user.email,
+                'ip_address': request.client_ip,
+                'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+                'status': LoginAttempt.Status.SUCCESS,
+                'created_at': timezone.now().isoformat(),
+            })
             
             response_data = {
                 'access': str(refresh.access_token),
                 'refresh': str(refresh),
-                'user': UserSerializer(user).data
+                'user': serialize_user(user)
             }
             
             return Response(response_data, status=status.HTTP_200_OK)
         
         # Log failed login attempt
-        email = request.data.get('email', '')
+        email = request.data.get('email', '') if isinstance(request.data, dict) else ''
         if email:
-            try:
-                user = User.objects.get(email__iexact=email)
-                user.failed_login_attempts += 1
+            user_id = User.objects.filter(email__iexact=email).values_list('id', flat=True).first()
+            if user_id:
+                # Count the failure atomically so concurrent attempts are not lost
+                users = User.objects.filter(pk=user_id)
+                users.update(failed_login_attempts=F('failed_login_attempts') + 1)
                 
-                # Lock account after 5 failed attempts
-                if user.failed_login_attempts >= 5:
-                    user.lock_account()
-                else:
-                    user.save(update_fields=['failed_login_attempts'])
-                    
-                LoginAttempt.objects.create(
-                    user=user,
-                    email=email,
-                    ip_address=self.get_client_ip(request),
-                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                    status=LoginAttempt.Status.FAILED,
-                    failure_reason='Invalid credentials'
-                )
-            except User.DoesNotExist:
-                LoginAttempt.objects.create(
-                    email=email,
-                    ip_address=self.get_client_ip(request),
-                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                    status=LoginAttempt.Status.FAILED,
-                    failure_reason='User not found'
-                )
+                # Lock account after 5 failed attempts unless already locked
+                now = timezone.now()
+                users.filter(
+                    Q(account_locked_until__isnull=True) | Q(account_locked_until__lte=now),
+                    failed_login_attempts__gte=5,
+                ).update(account_locked_until=now + timedelta(minutes=30))
+                
+                log_login_attempt.delay({
+                    'user_id': str(user_id),
+                    'email': email,
+                    'ip_address': request.client_ip,
+                    'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+                    'status': LoginAttempt.Status.FAILED,
+                    'failure_reason': 'Invalid credentials',
+                    'created_at': timezone.now().isoformat(),
+                })
+            else:
+                log_login_attempt.delay({
+                    'email': email,
+                    'ip_address': request.client_ip,
+                    'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+                    'status': LoginAttempt.Status.FAILED,
+                    'failure_reason': 'User not found',
+                    'created_at': timezone.now().isoformat(),
+                })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
-    def get_client_ip(self, request):
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
 
 
 class LogoutView(APIView):
-    """Handle user logout by blacklisting refresh token."""
+    """Handle user logout by revoking the refresh and access tokens."""
     
     permission_classes = [permissions.IsAuthenticated]
     
@@ -154,8 +175,10 @@ class LogoutView(APIView):
         try:
             refresh_token = request.data.get('refresh')
             if refresh_token:
-                token = RefreshToken(refresh_token)
-                token.blacklist()
+                revoke_token(RefreshToken(refresh_token))
+            
+            # Also revoke the access token used for this request
+            revoke_token(request.auth)
             
             return Response({'message': 'Successfully logged out'}, status=status.HTTP_200_OK)
         except TokenError:
@@ -179,7 +202,12 @@ class UpdateProfileView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        profile, created = UserProfile.objects.get_or_create(user=self.request.user)
+        # Profiles are created with the user. KYC fields are not exposed by
+        # the serializer; skip loading them.
+        profile = UserProfile.objects.defer(
+            'kyc_notes', 'id_document_image', 'id_document_number'
+        ).get(user=self.request.user)
+        profile.user = self.request.user  # reuse the loaded user for the nested serializer
         return profile
 
 
@@ -200,85 +228,3 @@ class ChangePasswordView(APIView):
             return Response({'message': 'Password changed successfully'}, status=status.HTTP_200_OK)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-
-# Placeholder views for features not yet implemented
-class VerifyEmailView(APIView):
-    """Placeholder email verification view"""
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def post(self, request):
-        return Response({'message': 'Email verification endpoint - Coming soon'}, status=status.HTTP_200_OK)
-
-
-class VerifyPhoneView(APIView):
-    """Placeholder phone verification view"""
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def post(self, request):
-        return Response({'message': 'Phone verification endpoint - Coming soon'}, status=status.HTTP_200_OK)
-
-
-class ResendVerificationView(APIView):
-    """Placeholder resend verification view"""
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def post(self, request):
-        return Response({'message': 'Resend verification endpoint - Coming soon'}, status=status.HTTP_200_OK)
-
-
-class PasswordResetView(APIView):
-    """Placeholder password reset view"""
-    permission_classes = [permissions.AllowAny]
-    
-    def post(self, request):
-        return Response({'message': 'Password reset endpoint - Coming soon'}, status=status.HTTP_200_OK)
-
-
-class PasswordResetConfirmView(APIView):
-    """Placeholder password reset confirm view"""
-    permission_classes = [permissions.AllowAny]
-    
-    def post(self, request):
-        return Response({'message': 'Password reset confirm endpoint - Coming soon'}, status=status.HTTP_200_OK)
-
-
-class AccountRecoveryView(APIView):
-    """Placeholder account recovery view"""
-    permission_classes = [permissions.AllowAny]
-    
-    def post(self, request):
-        return Response({'message': 'Account recovery endpoint - Coming soon'}, status=status.HTTP_200_OK)
-
-
-# Admin views (placeholders)
-class AdminUserListView(generics.ListAPIView):
-    """Placeholder admin user list view"""
-    permission_classes = [permissions.IsAdminUser]
-    
-    def get(self, request):
-        return Response({'message': 'Admin user list endpoint - Coming soon'}, status=status.HTTP_200_OK)
-
-
-class AdminUserDetailView(generics.RetrieveAPIView):
-    """Placeholder admin user detail view"""
-    permission_classes = [permissions.IsAdminUser]
-    
-    def get(self, request, user_id):
-        return Response({'message': f'Admin user detail endpoint for {user_id} - Coming soon'}, status=status.HTTP_200_OK)
-
-
-class AdminSessionListView(generics.ListAPIView):
-    """Placeholder admin session list view"""
-    permission_classes = [permissions.IsAdminUser]
-    
-    def get(self, request):
-        return Response({'message': 'Admin session list endpoint - Coming soon'}, status=status.HTTP_200_OK)
-
-
-class AdminLoginAttemptListView(generics.ListAPIView):
-    """Placeholder admin login attempt list view"""
-    permission_classes = [permissions.IsAdminUser]
-    
-    def get(self, request):
-        return Response({'message': 'Admin login attempt list endpoint - Coming soon'}, status=status.HTTP_200_OK)
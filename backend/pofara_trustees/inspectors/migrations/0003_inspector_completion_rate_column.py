@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:51
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspectors', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inspector',
+            name='completion_rate',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(then=models.Value(0), total_inspections=0), default=django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('completed_inspections'), '*', models.Value(100.0)), '/', models.F('total_inspections')), models.DecimalField(decimal_places=2, max_digits=5)), output_field=models.DecimalField(decimal_places=2, max_digits=5)), help_text='Completed inspections as a percentage of total inspections', output_field=models.DecimalField(decimal_places=2, max_digits=5)),
+        ),
+        migrations.AddIndex(
+            model_name='inspector',
+            index=models.Index(fields=['completion_rate'], name='inspectors_complet_172e4f_idx'),
+        ),
+    ]
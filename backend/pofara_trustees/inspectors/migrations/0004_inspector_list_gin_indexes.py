@@ -0,0 +1,32 @@
+# GIN indexes for the inspector list fields on PostgreSQL.
+#
+# Discovery filters such as specializations__contains=['electrical'] compile
+# to "col @> '[...]'::jsonb", which jsonb_path_ops GIN indexes serve directly.
+
+from django.db import migrations
+
+from pofara_trustees.db import RunPostgresSQL
+
+
+LIST_COLUMNS = ['specializations', 'skills', 'languages_spoken', 'service_regions']
+
+
+def gin_index(table, column):
+    return RunPostgresSQL(
+        sql=(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_gin ON {table} '
+            f'USING gin ({column} jsonb_path_ops);'
+        ),
+        reverse_sql=f'DROP INDEX IF EXISTS {table}_{column}_gin;',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspectors', '0003_inspector_completion_rate_column'),
+    ]
+
+    operations = [
+        gin_index('inspectors', column) for column in LIST_COLUMNS
+    ]
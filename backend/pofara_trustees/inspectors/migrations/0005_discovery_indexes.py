@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspectors', '0004_inspector_list_gin_indexes'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inspector',
+            index=models.Index(condition=models.Q(('is_available', True), ('status', 'approved')), fields=['-average_rating'], name='idx_inspector_rank'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectorrating',
+            index=models.Index(condition=models.Q(('is_verified', True)), fields=['inspector', '-created_at'], name='idx_rating_verified_recent'),
+        ),
+    ]
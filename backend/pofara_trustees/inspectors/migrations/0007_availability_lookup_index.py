@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-15 22:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inspectors', '0006_inspector_uuid7_pk'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inspectoravailability',
+            index=models.Index(condition=models.Q(('status', 'available')), fields=['inspector', 'date'], include=('start_time', 'end_time'), name='idx_avail_lookup'),
+        ),
+    ]
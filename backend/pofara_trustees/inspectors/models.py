@@ -4,11 +4,14 @@ Includes inspector profiles, certifications, availability, and verification syst
 """
 
 from django.db import models
+from django.db.models.functions import Cast
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from datetime import time, timedelta
 from phonenumber_field.modelfields import PhoneNumberField
-import uuid
+
+from pofara_trustees.db import uuid7
 
 User = get_user_model()
 
@@ -33,7 +36,7 @@ class Inspector(models.Model):
         EXPERT = 'expert', 'Expert (10+ years)'
     
     # Primary relationships
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='inspector_profile')
     
     # Inspector status and verification
@@ -116,6 +119,19 @@ class Inspector(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(5)]
     )
     total_ratings = models.PositiveIntegerField(default=0)
+    completion_rate = models.GeneratedField(
+        expression=models.Case(
+            models.When(total_inspections=0, then=models.Value(0)),
+            default=Cast(
+                models.F('completed_inspections') * 100.0 / models.F('total_inspections'),
+                models.DecimalField(max_digits=5, decimal_places=2),
+            ),
+            output_field=models.DecimalField(max_digits=5, decimal_places=2),
+        ),
+        output_field=models.DecimalField(max_digits=5, decimal_places=2),
+        db_persist=True,
+        help_text="Completed inspections as a percentage of total inspections",
+    )
     
     # Availability and status
     is_available = models.BooleanField(default=True)
@@ -175,19 +191,19 @@ class Inspector(models.Model):
             models.Index(fields=['verification_level']),
             models.Index(fields=['is_available']),
             models.Index(fields=['average_rating']),
+            models.Index(fields=['completion_rate']),
             models.Index(fields=['created_at']),
+            # Discovery listing: approved, available inspectors by rating
+            models.Index(
+                fields=['-average_rating'],
+                name='idx_inspector_rank',
+                condition=models.Q(status='approved', is_available=True),
+            ),
         ]
     
     def __str__(self):
         return f"Inspector: {self.user.get_full_name() or self.user.username}"
     
-    @property
-    def completion_rate(self):
-        """Calculate project completion rate as percentage."""
-        if self.total_inspections == 0:
-            return 0
-        return (self.completed_inspections / self.total_inspections) * 100
-    
     @property
     def is_verified(self):
         """Check if inspector meets minimum verification requirements."""
@@ -200,10 +216,18 @@ class Inspector(models.Model):
     
     def update_rating(self, new_rating):
         """Update average rating with new rating."""
-        total_score = self.average_rating * self.total_ratings + new_rating
-        self.total_ratings += 1
-        self.average_rating = total_score / self.total_ratings
-        self.save(update_fields=['average_rating', 'total_ratings'])
+        # Computed in SQL against the current row so concurrent ratings are not
+        # lost. The float cast keeps SQLite from doing integer division.
+        type(self).objects.filter(pk=self.pk).update(
+            average_rating=(
+                (Cast('average_rating', models.FloatField()) * models.F('total_ratings') + new_rating)
+                / (models.F('total_ratings') + 1)
+            ),
+            total_ratings=models.F('total_ratings') + 1,
+        )
+        # Mark both fields deferred so the next access reloads the stored values
+        self.__dict__.pop('average_rating', None)
+        self.__dict__.pop('total_ratings', None)
 
 
 class InspectorCertification(models.Model):
@@ -319,6 +343,12 @@ class InspectorRating(models.Model):
             models.Index(fields=['inspector', 'created_at']),
             models.Index(fields=['overall_rating']),
             models.Index(fields=['is_verified']),
+            # Latest verified ratings for an inspector
+            models.Index(
+                fields=['inspector', '-created_at'],
+                name='idx_rating_verified_recent',
+                condition=models.Q(is_verified=True),
+            ),
         ]
     
     def __str__(self):
@@ -381,10 +411,49 @@ class InspectorAvailability(models.Model):
             models.Index(fields=['inspector', 'date']),
             models.Index(fields=['status']),
             models.Index(fields=['date', 'start_time']),
+            # Covers the booking search over open slots (index-only scan)
+            models.Index(
+                fields=['inspector', 'date'],
+                include=['start_time', 'end_time'],
+                condition=models.Q(status='available'),
+                name='idx_avail_lookup',
+            ),
         ]
     
     def __str__(self):
         return f"{self.inspector.user.get_full_name()} - {self.date} {self.start_time}-{self.end_time}"
+    
+    @classmethod
+    def generate_recurring(cls, inspector, pattern, horizon_days, start_date=None):
+        """
+        Materialize available slots for a recurring pattern with batched INSERTs.
+        
+        The pattern holds 'weekdays' (0=Monday, 6=Sunday) and 'slots', a list
+        of [start, end] time pairs such as ["09:00", "12:00"]. Slots that
+        already exist for the inspector are skipped by the unique constraint.
+        """
+        start_date = start_date or timezone.now().date()
+        weekdays = set(pattern.get('weekdays', []))
+        slots = [
+            (time.fromisoformat(start), time.fromisoformat(end))
+            for start, end in pattern.get('slots', [])
+        ]
+        
+        windows = [
+            cls(
+                inspector=inspector,
+                date=day,
+                start_time=start,
+                end_time=end,
+                status=cls.Status.AVAILABLE,
+                is_recurring=True,
+                recurring_pattern=pattern,
+            )
+            for day in (start_date + timedelta(days=offset) for offset in range(horizon_days))
+            if day.weekday() in weekdays
+            for start, end in slots
+        ]
+        return cls.objects.bulk_create(windows, batch_size=1000, ignore_conflicts=True)
 
 
 class InspectorDocument(models.Model):
@@ -2,34 +2,34 @@
 URL configuration for inspectors app.
 """
 
-from django.urls import path, include
-from . import views
+from django.urls import path
+from pofara_trustees.views import placeholder_view
 
 app_name = 'inspectors'
 
 urlpatterns = [
     # Inspector management
-    path('', views.InspectorListView.as_view(), name='inspector_list'),
-    path('profile/', views.InspectorProfileView.as_view(), name='inspector_profile'),
-    path('<uuid:inspector_id>/', views.InspectorDetailView.as_view(), name='inspector_detail'),
+    path('', placeholder_view('Inspector list'), name='inspector_list'),
+    path('profile/', placeholder_view('Inspector profile'), name='inspector_profile'),
+    path('<uuid:inspector_id>/', placeholder_view('Inspector {inspector_id}'), name='inspector_detail'),
     
     # Certifications
-    path('certifications/', views.CertificationListCreateView.as_view(), name='certification_list_create'),
-    path('certifications/<uuid:cert_id>/', views.CertificationDetailView.as_view(), name='certification_detail'),
+    path('certifications/', placeholder_view('Certifications'), name='certification_list_create'),
+    path('certifications/<uuid:cert_id>/', placeholder_view('Certification {cert_id}'), name='certification_detail'),
     
     # Ratings and reviews
-    path('<uuid:inspector_id>/ratings/', views.RatingListCreateView.as_view(), name='rating_list_create'),
-    path('ratings/<uuid:rating_id>/', views.RatingDetailView.as_view(), name='rating_detail'),
+    path('<uuid:inspector_id>/ratings/', placeholder_view('Ratings'), name='rating_list_create'),
+    path('ratings/<uuid:rating_id>/', placeholder_view('Rating {rating_id}'), name='rating_detail'),
     
     # Availability
-    path('availability/', views.AvailabilityListCreateView.as_view(), name='availability_list_create'),
-    path('availability/<uuid:availability_id>/', views.AvailabilityDetailView.as_view(), name='availability_detail'),
+    path('availability/', placeholder_view('Availability'), name='availability_list_create'),
+    path('availability/<uuid:availability_id>/', placeholder_view('Availability {availability_id}'), name='availability_detail'),
     
     # Documents
-    path('documents/', views.DocumentListCreateView.as_view(), name='document_list_create'),
-    path('documents/<uuid:document_id>/', views.DocumentDetailView.as_view(), name='document_detail'),
+    path('documents/', placeholder_view('Inspector documents'), name='document_list_create'),
+    path('documents/<uuid:document_id>/', placeholder_view('Inspector document {document_id}'), name='document_detail'),
     
     # Applications and bookings
-    path('applications/', views.ApplicationListView.as_view(), name='application_list'),
-    path('bookings/', views.BookingListView.as_view(), name='booking_list'),
+    path('applications/', placeholder_view('Applications'), name='application_list'),
+    path('bookings/', placeholder_view('Bookings'), name='booking_list'),
 ] 
\ No newline at end of file
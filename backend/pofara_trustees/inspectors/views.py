@@ -1,42 +1,4 @@
-"""Placeholder views for inspectors app"""
-from rest_framework import generics, status
-from rest_framework.response import Response
+"""Views for inspectors app
 
-class InspectorListView(generics.ListAPIView):
-    def get(self, request): return Response({'message': 'Inspector list'}, status=status.HTTP_200_OK)
-
-class InspectorProfileView(generics.RetrieveUpdateAPIView):
-    def get(self, request): return Response({'message': 'Inspector profile'}, status=status.HTTP_200_OK)
-
-class InspectorDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, inspector_id): return Response({'message': f'Inspector {inspector_id}'}, status=status.HTTP_200_OK)
-
-class CertificationListCreateView(generics.ListCreateAPIView):
-    def get(self, request): return Response({'message': 'Certifications'}, status=status.HTTP_200_OK)
-
-class CertificationDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, cert_id): return Response({'message': f'Certification {cert_id}'}, status=status.HTTP_200_OK)
-
-class RatingListCreateView(generics.ListCreateAPIView):
-    def get(self, request, inspector_id): return Response({'message': 'Ratings'}, status=status.HTTP_200_OK)
-
-class RatingDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, rating_id): return Response({'message': f'Rating {rating_id}'}, status=status.HTTP_200_OK)
-
-class AvailabilityListCreateView(generics.ListCreateAPIView):
-    def get(self, request): return Response({'message': 'Availability'}, status=status.HTTP_200_OK)
-
-class AvailabilityDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, availability_id): return Response({'message': f'Availability {availability_id}'}, status=status.HTTP_200_OK)
-
-class DocumentListCreateView(generics.ListCreateAPIView):
-    def get(self, request): return Response({'message': 'Inspector documents'}, status=status.HTTP_200_OK)
-
-class DocumentDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, document_id): return Response({'message': f'Inspector document {document_id}'}, status=status.HTTP_200_OK)
-
-class ApplicationListView(generics.ListAPIView):
-    def get(self, request): return Response({'message': 'Applications'}, status=status.HTTP_200_OK)
-
-class BookingListView(generics.ListAPIView):
-    def get(self, request): return Response({'message': 'Bookings'}, status=status.HTTP_200_OK)
+Endpoints are placeholders until the inspector API lands; see urls.py.
+"""
@@ -0,0 +1,49 @@
+"""
+Cached per-user unread counts for the messaging app.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import ConversationParticipant, Notification
+
+
+UNREAD_COUNTS_KEY = 'unread:{}'
+UNREAD_COUNTS_TIMEOUT = 60
+
+
+def get_unread_counts(user):
+    """Return the user's unread message and notification counts, cached."""
+    return cache.get_or_set(
+        UNREAD_COUNTS_KEY.format(user.pk),
+        lambda: _compute_unread_counts(user),
+        UNREAD_COUNTS_TIMEOUT,
+    )
+
+
+def invalidate_unread_counts(user_ids):
+    """
+    Drop cached counts after messages or notifications change.
+
+    The keys are deleted once the current transaction commits; deleting
+    them earlier would let a concurrent request cache the old counts again.
+    """
+    keys = [UNREAD_COUNTS_KEY.format(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _compute_unread_counts(user):
+    # One SUM over the denormalized per-conversation counters
+    unread_messages = ConversationParticipant.objects.filter(user=user).exclude(
+        status__in=[ConversationParticipant.Status.LEFT, ConversationParticipant.Status.REMOVED]
+    ).aggregate(total=Sum('unread_count'))['total'] or 0
+    unread_notifications = Notification.objects.filter(
+        recipient=user,
+        status__in=Notification.UNREAD_STATUSES,
+    ).count()
+    return {
+        'unread_messages': unread_messages,
+        'unread_notifications': unread_notifications,
+    }
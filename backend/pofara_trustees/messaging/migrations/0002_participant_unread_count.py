@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread_counts(apps, schema_editor):
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+    Message = apps.get_model('messaging', 'Message')
+    db_alias = schema_editor.connection.alias
+
+    # Same rule as the old get_unread_count(): nothing is unread until the
+    # participant has read the conversation once.
+    unread = (
+        Message.objects.using(db_alias)
+        .filter(conversation=OuterRef('conversation'), created_at__gt=OuterRef('last_read_at'))
+        .exclude(sender=OuterRef('user'))
+        .order_by()
+        .values('conversation')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    ConversationParticipant.objects.using(db_alias).filter(last_read_at__isnull=False).update(
+        unread_count=Coalesce(Subquery(unread), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversationparticipant',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0, help_text='Messages from others since last read'),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_participant_counts(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ConversationParticipant = apps.get_model('messaging', 'ConversationParticipant')
+    db_alias = schema_editor.connection.alias
+
+    participants = (
+        ConversationParticipant.objects.using(db_alias)
+        .filter(conversation=OuterRef('pk'))
+        .order_by()
+        .values('conversation')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    Conversation.objects.using(db_alias).update(participant_count=Coalesce(Subquery(participants), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_participant_unread_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_participant_counts, migrations.RunPython.noop),
+    ]
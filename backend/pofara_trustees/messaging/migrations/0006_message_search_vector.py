@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:09
+#
+# On PostgreSQL, search_vector is filled by a trigger from plain_content and
+# served by a GIN index; other databases keep the column empty.
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from pofara_trustees.db import RunPostgresSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_notification_unread_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='Full-text index of plain_content, maintained by a PostgreSQL trigger', null=True),
+        ),
+        RunPostgresSQL(
+            sql=[
+                'CREATE TRIGGER messages_search_vector_update '
+                'BEFORE INSERT OR UPDATE OF plain_content ON messages '
+                'FOR EACH ROW EXECUTE FUNCTION '
+                "tsvector_update_trigger(search_vector, 'pg_catalog.english', plain_content);",
+                "UPDATE messages SET search_vector = to_tsvector('pg_catalog.english', plain_content);",
+                'CREATE INDEX IF NOT EXISTS messages_search_vector_gin ON messages USING gin (search_vector);',
+            ],
+            reverse_sql=[
+                'DROP INDEX IF EXISTS messages_search_vector_gin;',
+                'DROP TRIGGER IF EXISTS messages_search_vector_update ON messages;',
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+from pofara_trustees.db import RunPostgresSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('messaging', '0006_message_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(models.F('recipient'), models.F('metadata__project_id'), name='notif_project_idx'),
+        ),
+        # Containment filters such as attachments__contains=[{'type': 'image'}]
+        RunPostgresSQL(
+            sql='CREATE INDEX IF NOT EXISTS msg_attach_gin ON messages USING gin (attachments jsonb_path_ops);',
+            reverse_sql='DROP INDEX IF EXISTS msg_attach_gin;',
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:12
+#
+# Keep conversations.message_count and last_message_at current from a
+# trigger on messages, so posting a message is a single statement from the
+# application's side. Other databases use the signal in messaging.signals.
+
+from django.db import migrations
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from pofara_trustees.db import RunPostgresSQL
+
+
+def backfill_message_stats(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+    db_alias = schema_editor.connection.alias
+
+    messages = Message.objects.using(db_alias).filter(conversation=OuterRef('pk')).order_by().values('conversation')
+    Conversation.objects.using(db_alias).update(
+        message_count=Coalesce(Subquery(messages.annotate(count=Count('pk')).values('count')), 0),
+        last_message_at=Subquery(messages.annotate(latest=Max('created_at')).values('latest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0007_json_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_message_stats, migrations.RunPython.noop),
+        RunPostgresSQL(
+            sql=[
+                '''
+                CREATE OR REPLACE FUNCTION conversations_message_stats() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        UPDATE conversations
+                        SET message_count = message_count + 1,
+                            last_message_at = GREATEST(last_message_at, NEW.created_at)
+                        WHERE id = NEW.conversation_id;
+                    ELSE
+                        UPDATE conversations
+                        SET message_count = GREATEST(message_count - 1, 0)
+                        WHERE id = OLD.conversation_id;
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+                ''',
+                'CREATE TRIGGER messages_conversation_stats '
+                'AFTER INSERT OR DELETE ON messages '
+                'FOR EACH ROW EXECUTE FUNCTION conversations_message_stats();',
+            ],
+            reverse_sql=[
+                'DROP TRIGGER IF EXISTS messages_conversation_stats ON messages;',
+                'DROP FUNCTION IF EXISTS conversations_message_stats();',
+            ],
+        ),
+    ]
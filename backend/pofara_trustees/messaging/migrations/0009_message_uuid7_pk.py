@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:13
+
+import pofara_trustees.db
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0008_conversation_message_stats_trigger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='id',
+            field=models.UUIDField(default=pofara_trustees.db.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
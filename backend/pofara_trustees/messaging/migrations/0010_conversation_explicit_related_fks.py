@@ -0,0 +1,95 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:16
+
+import django.db.models.deletion
+from django.core.exceptions import ValidationError
+from django.db import migrations, models
+
+
+# related_kind -> (app_label, model) of the content type it replaces
+RELATED_KINDS = {
+    'project': ('projects', 'project'),
+    'milestone': ('projects', 'projectmilestone'),
+    'inspection_report': ('projects', 'inspectionreport'),
+}
+
+
+def copy_generic_relations(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    db_alias = schema_editor.connection.alias
+
+    for kind, (app_label, model) in RELATED_KINDS.items():
+        content_type = ContentType.objects.using(db_alias).filter(app_label=app_label, model=model).first()
+        if content_type is None:
+            continue
+        target = apps.get_model(app_label, model)
+        conversations = Conversation.objects.using(db_alias).filter(content_type=content_type)
+        for conversation in conversations.only('pk', 'object_id'):
+            # object_id is free text; links to rows that no longer exist are dropped
+            try:
+                target_pk = target._meta.pk.to_python(conversation.object_id)
+            except ValidationError:
+                continue
+            if target.objects.using(db_alias).filter(pk=target_pk).exists():
+                Conversation.objects.using(db_alias).filter(pk=conversation.pk).update(
+                    related_kind=kind, **{f'{kind}_id': target_pk}
+                )
+
+
+def restore_generic_relations(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    db_alias = schema_editor.connection.alias
+
+    for kind, (app_label, model) in RELATED_KINDS.items():
+        content_type, _ = ContentType.objects.using(db_alias).get_or_create(app_label=app_label, model=model)
+        conversations = Conversation.objects.using(db_alias).filter(related_kind=kind, **{f'{kind}__isnull': False})
+        for conversation in conversations.only('pk', f'{kind}_id'):
+            Conversation.objects.using(db_alias).filter(pk=conversation.pk).update(
+                content_type=content_type, object_id=str(getattr(conversation, f'{kind}_id'))
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0009_message_uuid7_pk'),
+        ('projects', '0001_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='inspection_report',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='conversations', to='projects.inspectionreport'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='milestone',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='conversations', to='projects.projectmilestone'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='project',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='conversations', to='projects.project'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='related_kind',
+            field=models.CharField(blank=True, choices=[('', 'None'), ('project', 'Project'), ('milestone', 'Milestone'), ('inspection_report', 'Inspection Report')], default='', max_length=20),
+        ),
+        migrations.RunPython(copy_generic_relations, restore_generic_relations),
+        migrations.RemoveIndex(
+            model_name='conversation',
+            name='conversatio_content_d5b00f_idx',
+        ),
+        migrations.RemoveField(
+            model_name='conversation',
+            name='content_type',
+        ),
+        migrations.RemoveField(
+            model_name='conversation',
+            name='object_id',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Range-partition notifications by month on PostgreSQL so the hot recent
+# months keep small indexes. Partitions ahead of time are created by
+# messaging.tasks.maintain_notification_partitions. Messages stay a plain
+# table: replies, receipts and attachments hold foreign keys to it, which
+# PostgreSQL only allows into a partitioned table if they carry created_at.
+
+from django.db import migrations
+
+from pofara_trustees.db import partition_table_by_month, unpartition_table
+
+
+def partition_notifications(apps, schema_editor):
+    partition_table_by_month(schema_editor, 'notifications', 'created_at')
+
+
+def unpartition_notifications(apps, schema_editor):
+    unpartition_table(schema_editor, 'notifications')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0010_conversation_explicit_related_fks'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_notifications, unpartition_notifications),
+    ]
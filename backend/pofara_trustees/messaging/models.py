@@ -3,13 +3,18 @@ Messaging and communication models for the Pofara Trustees platform.
 Includes secure messaging, notifications, and real-time communication features.
 """
 
-from django.db import models
+from collections import Counter
+
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 import uuid
 
+from pofara_trustees.db import uuid7
+
 User = get_user_model()
 
 
@@ -31,6 +36,12 @@ class Conversation(models.Model):
         CLOSED = 'closed', 'Closed'
         SUSPENDED = 'suspended', 'Suspended'
     
+    class RelatedKind(models.TextChoices):
+        NONE = '', 'None'
+        PROJECT = 'project', 'Project'
+        MILESTONE = 'milestone', 'Milestone'
+        INSPECTION_REPORT = 'inspection_report', 'Inspection Report'
+    
     # Primary identifiers
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     conversation_type = models.CharField(max_length=20, choices=ConversationType.choices, default=ConversationType.DIRECT)
@@ -48,10 +59,17 @@ class Conversation(models.Model):
         related_name='conversations'
     )
     
-    # Related objects (polymorphic relationship)
-    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
-    object_id = models.CharField(max_length=255, null=True, blank=True)
-    related_object = GenericForeignKey('content_type', 'object_id')
+    # Related object - one nullable FK per target so list views can join them
+    related_kind = models.CharField(max_length=20, choices=RelatedKind.choices, default=RelatedKind.NONE, blank=True)
+    project = models.ForeignKey(
+        'projects.Project', on_delete=models.SET_NULL, related_name='conversations', null=True, blank=True
+    )
+    milestone = models.ForeignKey(
+        'projects.ProjectMilestone', on_delete=models.SET_NULL, related_name='conversations', null=True, blank=True
+    )
+    inspection_report = models.ForeignKey(
+        'projects.InspectionReport', on_delete=models.SET_NULL, related_name='conversations', null=True, blank=True
+    )
     
     # Settings
     is_encrypted = models.BooleanField(default=True, help_text="End-to-end encryption enabled")
@@ -64,6 +82,7 @@ class Conversation(models.Model):
     # Activity tracking
     last_message_at = models.DateTimeField(null=True, blank=True)
     message_count = models.PositiveIntegerField(default=0)
+    participant_count = models.PositiveIntegerField(default=0)
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -78,19 +97,31 @@ class Conversation(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['created_by']),
             models.Index(fields=['last_message_at']),
-            models.Index(fields=['content_type', 'object_id']),
         ]
         ordering = ['-last_message_at', '-created_at']
     
     def __str__(self):
         if self.title:
             return self.title
-        participants = self.participants.all()[:3]
-        participant_names = [p.get_full_name() or p.username for p in participants]
-        if len(participants) > 3:
-            participant_names.append(f"and {len(participants) - 3} others")
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('participants')
+        if prefetched is not None:
+            participants = list(prefetched)
+            total = len(participants)
+        else:
+            participants = list(self.participants.only('first_name', 'last_name', 'username')[:3])
+            total = self.participant_count
+        participant_names = [p.get_full_name() or p.username for p in participants[:3]]
+        if total > 3:
+            participant_names.append(f"and {total - 3} others")
         return f"Conversation: {', '.join(participant_names)}"
     
+    @property
+    def related_object(self):
+        """The project, milestone or inspection report this conversation is about."""
+        if self.related_kind:
+            return getattr(self, self.related_kind)
+        return None
+    
     def add_participant(self, user, role='member', added_by=None):
         """Add a participant to the conversation."""
         participant, created = ConversationParticipant.objects.get_or_create(
@@ -106,13 +137,10 @@ class Conversation(models.Model):
     
     def get_unread_count(self, user):
         """Get unread message count for a specific user."""
-        try:
-            participant = self.conversation_participants.get(user=user)
-            return self.messages.filter(
-                created_at__gt=participant.last_read_at or timezone.now()
-            ).exclude(sender=user).count()
-        except ConversationParticipant.DoesNotExist:
-            return 0
+        unread_count = self.conversation_participants.filter(user=user).values_list(
+            'unread_count', flat=True
+        ).first()
+        return unread_count or 0
 
 
 class ConversationParticipant(models.Model):
@@ -149,6 +177,7 @@ class ConversationParticipant(models.Model):
     # Activity tracking
     joined_at = models.DateTimeField(auto_now_add=True)
     last_read_at = models.DateTimeField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0, help_text="Messages from others since last read")
     last_active_at = models.DateTimeField(auto_now=True)
     
     # Management
@@ -184,8 +213,15 @@ class ConversationParticipant(models.Model):
     
     def mark_as_read(self):
         """Mark conversation as read for this participant."""
+        from .cache import invalidate_unread_counts
+        
+        # A single UPDATE; update() skips post_save, so the cache is cleared here
         self.last_read_at = timezone.now()
-        self.save(update_fields=['last_read_at'])
+        self.unread_count = 0
+        ConversationParticipant.objects.filter(pk=self.pk).update(
+            last_read_at=self.last_read_at, unread_count=0
+        )
+        invalidate_unread_counts([self.user_id])
 
 
 class Message(models.Model):
@@ -210,8 +246,8 @@ class Message(models.Model):
         FAILED = 'failed', 'Failed'
         DELETED = 'deleted', 'Deleted'
     
-    # Primary identifiers
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Primary identifiers (time-ordered, so new rows append to the index)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
     
     # Message details
@@ -222,6 +258,11 @@ class Message(models.Model):
     # Content
     content = models.TextField(help_text="Message content (encrypted if encryption enabled)")
     plain_content = models.TextField(blank=True, help_text="Plain text content for search indexing")
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="Full-text index of plain_content, maintained by a PostgreSQL trigger"
+    )
     
     # Reply and threading
     reply_to = models.ForeignKey(
@@ -284,7 +325,8 @@ class Message(models.Model):
         verbose_name = 'Message'
         verbose_name_plural = 'Messages'
         indexes = [
-            models.Index(fields=['conversation', 'created_at']),
+            # Matches the newest-first timeline order used by keyset pagination
+            models.Index(fields=['conversation', '-created_at', '-id'], name='msg_conv_time_desc'),
             models.Index(fields=['sender']),
             models.Index(fields=['message_type']),
             models.Index(fields=['status']),
@@ -299,12 +341,63 @@ class Message(models.Model):
     
     def mark_as_read(self, user):
         """Mark message as read by a specific user."""
-        receipt, created = MessageReadReceipt.objects.get_or_create(
-            message=self,
-            user=user,
-            defaults={'read_at': timezone.now()}
+        Message.mark_many_as_read([self.pk], user)
+        return MessageReadReceipt.objects.get(message=self, user=user)
+    
+    def is_unread_for(self, participant):
+        """Whether this message still counts towards the participant's unread_count."""
+        return self.sender_id != participant.user_id and (
+            participant.last_read_at is None or self.created_at > participant.last_read_at
         )
-        return receipt
+    
+    @classmethod
+    def mark_many_as_read(cls, message_ids, user, batch_size=500):
+        """
+        Record read receipts for many messages in one INSERT and take the
+        newly read ones off the user's unread counters.
+
+        Existing receipts are left untouched (ON CONFLICT DO NOTHING). Once
+        a conversation has no unread messages left, its last_read_at moves
+        to now, as with ConversationParticipant.mark_as_read().
+        """
+        from .cache import invalidate_unread_counts
+        
+        now = timezone.now()
+        with transaction.atomic():
+            # Locking the user's participant rows keeps concurrent requests
+            # from both counting the same message as newly read
+            participants = {
+                participant.conversation_id: participant
+                for participant in ConversationParticipant.objects.select_for_update().filter(
+                    user=user,
+                    conversation_id__in=cls.objects.filter(pk__in=message_ids).values('conversation_id'),
+                )
+            }
+            already_read = set(MessageReadReceipt.objects.filter(
+                user=user, message_id__in=message_ids
+            ).values_list('message_id', flat=True))
+            newly_read = cls.objects.filter(pk__in=message_ids).exclude(pk__in=already_read).only(
+                'pk', 'conversation_id', 'sender_id', 'created_at'
+            )
+            
+            read_counts = Counter()
+            receipts = []
+            for message in newly_read:
+                receipts.append(MessageReadReceipt(message_id=message.pk, user=user, read_at=now))
+                participant = participants.get(message.conversation_id)
+                if participant is not None and message.is_unread_for(participant):
+                    read_counts[message.conversation_id] += 1
+            MessageReadReceipt.objects.bulk_create(receipts, ignore_conflicts=True, batch_size=batch_size)
+            
+            for conversation_id, count in read_counts.items():
+                participant = participants[conversation_id]
+                unread_count = max(participant.unread_count - count, 0)
+                ConversationParticipant.objects.filter(pk=participant.pk).update(
+                    unread_count=unread_count,
+                    last_read_at=now if unread_count == 0 else participant.last_read_at,
+                )
+        if read_counts:
+            invalidate_unread_counts([user.pk])
 
 
 class MessageReadReceipt(models.Model):
@@ -412,6 +505,8 @@ class Notification(models.Model):
         DISMISSED = 'dismissed', 'Dismissed'
         FAILED = 'failed', 'Failed'
     
+    UNREAD_STATUSES = [Status.PENDING, Status.SENT]
+    
     # Primary identifiers
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
@@ -464,11 +559,19 @@ class Notification(models.Model):
         verbose_name_plural = 'Notifications'
         indexes = [
             models.Index(fields=['recipient', 'status']),
+            # Small partial index for the unread inbox and unread counts
+            models.Index(
+                fields=['recipient', '-created_at'],
+                name='notif_unread_idx',
+                condition=models.Q(status__in=['pending', 'sent']),
+            ),
             models.Index(fields=['notification_type']),
             models.Index(fields=['priority']),
             models.Index(fields=['scheduled_for']),
             models.Index(fields=['created_at']),
             models.Index(fields=['content_type', 'object_id']),
+            # Expression index for the ?project= filter on metadata
+            models.Index(models.F('recipient'), models.F('metadata__project_id'), name='notif_project_idx'),
         ]
         ordering = ['-created_at']
     
@@ -477,10 +580,20 @@ class Notification(models.Model):
     
     def mark_as_read(self):
         """Mark notification as read."""
-        if self.status != self.Status.READ:
-            self.status = self.Status.READ
-            self.read_at = timezone.now()
-            self.save(update_fields=['status', 'read_at'])
+        from .cache import invalidate_unread_counts
+        
+        if self.status == self.Status.READ:
+            return
+        # A single UPDATE; update() skips post_save, so the cache is cleared here.
+        # updated_at is bumped by hand because auto_now only applies on save().
+        now = timezone.now()
+        updated = Notification.objects.filter(pk=self.pk).exclude(status=self.Status.READ).update(
+            status=self.Status.READ, read_at=now, updated_at=now
+        )
+        self.status = self.Status.READ
+        if updated:
+            self.read_at = self.updated_at = now
+            invalidate_unread_counts([self.recipient_id])
     
     def is_expired(self):
         """Check if notification is expired."""
@@ -0,0 +1,66 @@
+"""
+Notification fanout for the messaging app.
+"""
+
+from celery import group
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils.text import Truncator
+
+from .cache import invalidate_unread_counts
+from .models import ConversationParticipant, Notification
+from .tasks import deliver_notification
+
+
+NOTIFICATION_BATCH_SIZE = 1000
+
+
+def notify_new_message(message):
+    """
+    Notify everyone in the message's conversation but the sender.
+
+    All notifications are written with one batched INSERT and handed to
+    the workers as a single Celery group once the transaction commits.
+    Participants who left, muted the conversation or turned message
+    notifications off are skipped.
+    """
+    recipient_ids = list(
+        ConversationParticipant.objects.filter(
+            conversation_id=message.conversation_id,
+            status=ConversationParticipant.Status.ACTIVE,
+            notifications_enabled=True,
+        ).exclude(
+            user_id=message.sender_id,
+        ).exclude(
+            user__notification_preferences__message_notifications=False,
+        ).values_list('user_id', flat=True)
+    )
+    if not recipient_ids:
+        return []
+
+    sender_name = message.sender.get_full_name() or message.sender.username
+    text = message.plain_content or 'You have a new message.'
+    fields = {
+        'notification_type': Notification.NotificationType.MESSAGE,
+        'title': Truncator(f'New message from {sender_name}').chars(200),
+        'message': text,
+        'short_message': Truncator(text).chars(100),
+        'content_type': ContentType.objects.get_for_model(message),
+        'object_id': str(message.pk),
+        'metadata': {
+            'conversation_id': str(message.conversation_id),
+            'message_id': str(message.pk),
+        },
+    }
+    notifications = Notification.objects.bulk_create(
+        [Notification(recipient_id=user_id, **fields) for user_id in recipient_ids],
+        batch_size=NOTIFICATION_BATCH_SIZE,
+    )
+
+    # bulk_create() skips post_save, so clear the cached counts here
+    invalidate_unread_counts(recipient_ids)
+    notification_ids = [str(notification.pk) for notification in notifications]
+    transaction.on_commit(
+        lambda: group(deliver_notification.s(pk) for pk in notification_ids).apply_async()
+    )
+    return notifications
@@ -0,0 +1,135 @@
+"""
+Serializers for messaging app.
+"""
+
+from rest_framework import serializers
+from django.contrib.auth import get_user_model
+from .models import Conversation, ConversationParticipant, Message, MessageAttachment, Notification
+
+User = get_user_model()
+
+
+class RelatedObjectField(serializers.Field):
+    """Read-only summary of the object a conversation or notification is about."""
+    
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, value):
+        return {'type': value._meta.model_name, 'id': str(value.pk), 'name': str(value)}
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    """Serializer for conversation lists and creation."""
+    
+    display_name = serializers.CharField(source='__str__', read_only=True)
+    related_object = RelatedObjectField()
+    participant_ids = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.all(), many=True, write_only=True, required=False
+    )
+    
+    class Meta:
+        model = Conversation
+        fields = [
+            'id', 'conversation_type', 'status', 'title', 'description',
+            'display_name', 'related_object', 'is_encrypted', 'allow_file_sharing',
+            'created_by', 'participant_ids', 'participant_count',
+            'last_message_at', 'message_count', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'status', 'created_by', 'participant_count',
+            'last_message_at', 'message_count', 'created_at', 'updated_at'
+        ]
+    
+    def create(self, validated_data):
+        participants = validated_data.pop('participant_ids', [])
+        conversation = super().create(validated_data)
+        conversation.add_participant(conversation.created_by, role=ConversationParticipant.Role.OWNER)
+        for user in participants:
+            if user != conversation.created_by:
+                conversation.add_participant(user)
+        # participant_count is maintained in the database by signals
+        conversation.refresh_from_db(fields=['participant_count'])
+        return conversation
+
+
+class MessageAttachmentSerializer(serializers.ModelSerializer):
+    """Serializer for files attached to a message."""
+    
+    class Meta:
+        model = MessageAttachment
+        fields = ['id', 'file', 'filename', 'file_size', 'file_type', 'attachment_type', 'thumbnail', 'uploaded_at']
+        read_only_fields = fields
+
+
+class MessageSerializer(serializers.ModelSerializer):
+    """Serializer for messages in a conversation."""
+    
+    sender_name = serializers.CharField(source='sender.get_full_name', read_only=True)
+    reply_to_preview = serializers.SerializerMethodField()
+    read_by = serializers.SerializerMethodField()
+    message_attachments = MessageAttachmentSerializer(many=True, read_only=True)
+    
+    class Meta:
+        model = Message
+        fields = [
+            'id', 'conversation', 'sender', 'sender_name', 'message_type',
+            'status', 'content', 'plain_content', 'reply_to', 'reply_to_preview',
+            'thread_root', 'mentioned_users', 'hashtags', 'attachments',
+            'message_attachments', 'edited', 'edited_at', 'read_by',
+            'is_important', 'is_urgent', 'requires_response',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'conversation', 'sender', 'status', 'edited', 'edited_at',
+            'created_at', 'updated_at'
+        ]
+    
+    def validate(self, attrs):
+        # Replies stay attached to what they were posted under
+        if self.instance is not None:
+            attrs.pop('reply_to', None)
+            attrs.pop('thread_root', None)
+            return attrs
+        # Only messages of the same conversation, so the preview can't leak others
+        conversation_id = str(self.context['conversation_id'])
+        for field in ('reply_to', 'thread_root'):
+            target = attrs.get(field)
+            if target is not None and str(target.conversation_id) != conversation_id:
+                raise serializers.ValidationError({
+                    field: self.fields[field].error_messages['does_not_exist'].format(pk_value=target.pk)
+                })
+        return attrs
+    
+    def get_reply_to_preview(self, obj):
+        if obj.reply_to is None:
+            return None
+        return (obj.reply_to.plain_content or obj.reply_to.content)[:50]
+    
+    def get_read_by(self, obj):
+        # Iterates the prefetched receipts rather than querying per message
+        return [str(receipt.user_id) for receipt in obj.read_receipts.all()]
+
+
+class MarkMessagesReadSerializer(serializers.Serializer):
+    """Input for marking several messages as read at once."""
+    
+    message_ids = serializers.ListField(
+        child=serializers.UUIDField(), required=False, max_length=500
+    )
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """Serializer for notification lists."""
+    
+    related_object = RelatedObjectField()
+    
+    class Meta:
+        model = Notification
+        fields = [
+            'id', 'notification_type', 'priority', 'status', 'title',
+            'message', 'short_message', 'related_object', 'action_url',
+            'action_text', 'read_at', 'created_at'
+        ]
+        read_only_fields = fields
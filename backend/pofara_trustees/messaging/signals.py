@@ -0,0 +1,93 @@
+"""
+Signal handlers for the messaging app.
+"""
+
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_unread_counts
+from .models import Conversation, ConversationParticipant, Message, MessageReadReceipt, Notification
+
+
+@receiver(post_save, sender=Message)
+def increment_unread_counts(sender, instance, created, raw=False, **kwargs):
+    """Count a new message as unread for everyone in the conversation but the sender."""
+    if created and not raw:
+        recipients = ConversationParticipant.objects.filter(
+            conversation_id=instance.conversation_id
+        ).exclude(user_id=instance.sender_id)
+        recipients.update(unread_count=F('unread_count') + 1)
+        invalidate_unread_counts(recipients.values_list('user_id', flat=True))
+
+
+@receiver(pre_delete, sender=Message)
+def decrement_unread_counts(sender, instance, **kwargs):
+    """
+    Take a deleted message off the counters of recipients who hadn't read it.
+
+    Runs before the delete, while its read receipts still exist.
+    """
+    recipients = ConversationParticipant.objects.filter(
+        Q(last_read_at__isnull=True) | Q(last_read_at__lt=instance.created_at),
+        conversation_id=instance.conversation_id,
+        unread_count__gt=0,
+    ).exclude(user_id=instance.sender_id).exclude(
+        user_id__in=MessageReadReceipt.objects.filter(message_id=instance.pk).values('user_id')
+    )
+    user_ids = list(recipients.values_list('user_id', flat=True))
+    ConversationParticipant.objects.filter(
+        conversation_id=instance.conversation_id, user_id__in=user_ids
+    ).update(unread_count=F('unread_count') - 1)
+    invalidate_unread_counts(user_ids)
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def update_conversation_message_stats(sender, instance, using, created=False, raw=False, **kwargs):
+    """
+    Keep Conversation.message_count and last_message_at current.
+
+    PostgreSQL does this in the messages_conversation_stats trigger.
+    """
+    if raw or connections[using].vendor == 'postgresql':
+        return
+    conversation = Conversation.objects.using(using).filter(pk=instance.conversation_id)
+    if kwargs['signal'] is post_delete:
+        conversation.filter(message_count__gt=0).update(message_count=F('message_count') - 1)
+    elif created:
+        conversation.update(message_count=F('message_count') + 1, last_message_at=instance.created_at)
+
+
+@receiver(post_save, sender=ConversationParticipant)
+def increment_participant_count(sender, instance, created, raw=False, **kwargs):
+    """Keep Conversation.participant_count in step with added participants."""
+    if created and not raw:
+        Conversation.objects.filter(pk=instance.conversation_id).update(
+            participant_count=F('participant_count') + 1
+        )
+
+
+@receiver(post_delete, sender=ConversationParticipant)
+def decrement_participant_count(sender, instance, **kwargs):
+    """Keep Conversation.participant_count in step with removed participants."""
+    Conversation.objects.filter(pk=instance.conversation_id, participant_count__gt=0).update(
+        participant_count=F('participant_count') - 1
+    )
+
+
+@receiver(post_save, sender=ConversationParticipant)
+@receiver(post_delete, sender=ConversationParticipant)
+def invalidate_participant_unread_counts(sender, instance, raw=False, **kwargs):
+    """Read markers, status changes and removals change the unread totals."""
+    if not raw:
+        invalidate_unread_counts([instance.user_id])
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_notification_unread_counts(sender, instance, raw=False, **kwargs):
+    """New, read and deleted notifications change the unread totals."""
+    if not raw:
+        invalidate_unread_counts([instance.recipient_id])
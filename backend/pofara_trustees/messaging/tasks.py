@@ -0,0 +1,36 @@
+"""
+Celery tasks for the messaging app.
+"""
+
+from celery import shared_task
+from django.db import connection
+from django.utils import timezone
+
+from pofara_trustees.db import create_monthly_partitions
+
+from .models import Notification
+
+
+NOTIFICATION_PARTITIONS_AHEAD = 3
+
+
+@shared_task(ignore_result=True)
+def deliver_notification(notification_id):
+    """
+    Deliver a pending notification and record when it went out.
+
+    In-app delivery only needs the status change; push, email and SMS
+    providers hook in here as they are added.
+    """
+    now = timezone.now()
+    return Notification.objects.filter(
+        pk=notification_id, status=Notification.Status.PENDING
+    ).update(status=Notification.Status.SENT, sent_at=now, updated_at=now)
+
+
+@shared_task(ignore_result=True)
+def maintain_notification_partitions():
+    """Keep the monthly notifications partitions ahead of time (PostgreSQL only)."""
+    create_monthly_partitions(
+        connection, Notification._meta.db_table, timezone.now().date(), NOTIFICATION_PARTITIONS_AHEAD + 1
+    )
@@ -1,3 +1,192 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from .cache import UNREAD_COUNTS_KEY
+from .models import Conversation, ConversationParticipant, Message, MessageReadReceipt, Notification
+from .notifications import notify_new_message
+
+User = get_user_model()
+
+
+class UnreadCountTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.sender = User.objects.create_user(username='sender', email='sender@example.com', password='x')
+        self.reader = User.objects.create_user(username='reader', email='reader@example.com', password='x')
+        self.conversation = Conversation.objects.create(created_by=self.sender)
+        for user in (self.sender, self.reader):
+            ConversationParticipant.objects.create(conversation=self.conversation, user=user)
+        self.messages = [self.send(f'message {number}') for number in range(3)]
+
+    def send(self, content, sender=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Message.objects.create(
+                conversation=self.conversation, sender=sender or self.sender, content=content, plain_content=content
+            )
+
+    def delete(self, message):
+        self.client.force_authenticate(message.sender)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.delete(f'/api/v1/messaging/messages/{message.pk}/')
+
+    def participant(self, user):
+        return ConversationParticipant.objects.get(conversation=self.conversation, user=user)
+
+    def unread_messages(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get('/api/v1/messaging/unread-count/').json()['unread_messages']
+
+    def mark_read(self, user, message, *others):
+        self.client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f'/api/v1/messaging/messages/{message.pk}/read/',
+                {'message_ids': [str(other.pk) for other in others]},
+                format='json',
+            )
+
+    def test_new_messages_count_for_recipients_only(self):
+        self.assertEqual(self.unread_messages(self.reader), 3)
+        self.assertEqual(self.unread_messages(self.sender), 0)
+
+    def test_marking_read_decrements_the_counter(self):
+        self.assertEqual(self.unread_messages(self.reader), 3)
+        self.assertEqual(self.mark_read(self.reader, self.messages[0]).status_code, 200)
+        self.assertEqual(self.unread_messages(self.reader), 2)
+        self.assertIsNone(self.participant(self.reader).last_read_at)
+
+    def test_marking_read_again_does_not_decrement_twice(self):
+        self.mark_read(self.reader, self.messages[0])
+        self.mark_read(self.reader, self.messages[0], self.messages[0])
+        self.assertEqual(self.unread_messages(self.reader), 2)
+
+    def test_reading_everything_resets_the_counter(self):
+        self.mark_read(self.reader, *self.messages)
+        self.assertEqual(self.unread_messages(self.reader), 0)
+        self.assertIsNotNone(self.participant(self.reader).last_read_at)
+        self.assertEqual(MessageReadReceipt.objects.filter(user=self.reader).count(), 3)
+
+    def test_own_messages_do_not_decrement(self):
+        own = self.send('reply', sender=self.reader)
+        self.mark_read(self.reader, own)
+        self.assertEqual(self.unread_messages(self.reader), 3)
+
+    def test_deleting_an_unread_message_decrements_the_counter(self):
+        self.assertEqual(self.unread_messages(self.reader), 3)
+        self.assertEqual(self.delete(self.messages[0]).status_code, 204)
+        self.assertEqual(self.unread_messages(self.reader), 2)
+
+    def test_deleting_a_read_message_leaves_the_counter(self):
+        self.mark_read(self.reader, self.messages[0])
+        self.assertEqual(self.unread_messages(self.reader), 2)
+        self.delete(self.messages[0])
+        self.assertEqual(self.unread_messages(self.reader), 2)
+
+    def test_deleting_after_the_conversation_was_read_leaves_the_counter(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participant(self.reader).mark_as_read()
+        newer = self.send('newer')
+        self.delete(self.messages[0])
+        self.assertEqual(self.unread_messages(self.reader), 1)
+        self.delete(newer)
+        self.assertEqual(self.unread_messages(self.reader), 0)
+
+    def test_cached_counts_are_dropped_on_commit(self):
+        self.assertEqual(self.unread_messages(self.reader), 3)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Message.objects.create(
+                conversation=self.conversation, sender=self.sender, content='late', plain_content='late'
+            )
+        # Until the commit, other requests keep seeing the committed counts
+        self.assertIsNotNone(cache.get(UNREAD_COUNTS_KEY.format(self.reader.pk)))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.unread_messages(self.reader), 4)
+
+
+class ReplyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='replier', email='replier@example.com', password='x')
+        self.outsider = User.objects.create_user(username='outsider', email='outsider@example.com', password='x')
+        self.conversation = self.conversation_of(self.user)
+        self.private = self.conversation_of(self.outsider)
+        self.secret = Message.objects.create(
+            conversation=self.private, sender=self.outsider, content='secret plans', plain_content='secret plans'
+        )
+        self.client.force_authenticate(self.user)
+
+    def conversation_of(self, user):
+        conversation = Conversation.objects.create(created_by=user)
+        ConversationParticipant.objects.create(conversation=conversation, user=user)
+        return conversation
+
+    def post(self, **fields):
+        return self.client.post(
+            f'/api/v1/messaging/conversations/{self.conversation.pk}/messages/',
+            {'content': 'reply', **fields}, format='json',
+        )
+
+    def test_reply_within_the_conversation(self):
+        original = Message.objects.create(
+            conversation=self.conversation, sender=self.user, content='original', plain_content='original'
+        )
+        response = self.post(reply_to=str(original.pk), thread_root=str(original.pk))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['reply_to_preview'], 'original')
+
+    def test_messages_of_other_conversations_are_rejected(self):
+        for field in ('reply_to', 'thread_root'):
+            response = self.post(**{field: str(self.secret.pk)})
+            self.assertEqual(response.status_code, 400)
+            self.assertNotIn('secret', response.content.decode())
+
+    def test_reply_fields_are_read_only_on_update(self):
+        message = Message.objects.create(
+            conversation=self.conversation, sender=self.user, content='mine', plain_content='mine'
+        )
+        response = self.client.patch(
+            f'/api/v1/messaging/messages/{message.pk}/', {'reply_to': str(self.secret.pk)}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['reply_to_preview'])
+        message.refresh_from_db()
+        self.assertIsNone(message.reply_to_id)
+
+
+class NotifyNewMessageTests(APITestCase):
+    def test_long_sender_names_fit_the_title(self):
+        sender = User.objects.create_user(
+            username='long', email='long@example.com', password='x', first_name='F' * 150, last_name='L' * 150
+        )
+        reader = User.objects.create_user(username='short', email='short@example.com', password='x')
+        conversation = Conversation.objects.create(created_by=sender)
+        for user in (sender, reader):
+            ConversationParticipant.objects.create(conversation=conversation, user=user)
+        message = Message.objects.create(conversation=conversation, sender=sender, content='hi', plain_content='hi')
+
+        notification, = notify_new_message(message)
+        self.assertEqual(len(notification.title), 200)
+        self.assertTrue(notification.title.startswith('New message from FFF'))
+
+
+class NotificationListTests(APITestCase):
+    url = '/api/v1/messaging/notifications/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='notified', email='notified@example.com', password='x')
+        for status in (Notification.Status.SENT, Notification.Status.READ):
+            Notification.objects.create(
+                recipient=self.user, notification_type=Notification.NotificationType.MESSAGE,
+                title=status, message=status, status=status,
+            )
+        self.client.force_authenticate(self.user)
+
+    def titles(self, **params):
+        return sorted(item['title'] for item in self.client.get(self.url, params).json()['results'])
+
+    def test_read_notifications_are_listed_by_default(self):
+        self.assertEqual(self.titles(), ['read', 'sent'])
+
+    def test_unread_only_on_request(self):
+        self.assertEqual(self.titles(unread='1'), ['sent'])
@@ -1,46 +1,242 @@
-"""Placeholder views for messaging app"""
-from rest_framework import generics, status
+"""Views for messaging app"""
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.db.models import Count, Max, Prefetch, Sum
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from projects.models import InspectionReport, Project, ProjectMilestone
+from .cache import get_unread_counts
+from .models import Conversation, ConversationParticipant, Message, MessageReadReceipt, Notification
+from .notifications import notify_new_message
+from .serializers import (
+    ConversationSerializer,
+    MarkMessagesReadSerializer,
+    MessageSerializer,
+    NotificationSerializer,
+)
+
+User = get_user_model()
+
+
+def related_object_prefetch():
+    """Batch-load generic related objects with one query per content type."""
+    return GenericPrefetch('related_object', [
+        Project.objects.all(),
+        ProjectMilestone.objects.select_related('project'),
+        InspectionReport.objects.all(),
+        Message.objects.select_related('sender'),
+    ])
+
+
+def list_etag(request, queryset, **aggregates):
+    """
+    ETag for a list endpoint, built from one aggregate query.
+
+    The row count catches additions and removals; the other aggregates
+    catch changes to listed rows. The user and full path (filters, page)
+    are mixed in so different views of the data never share a tag.
+    """
+    state = queryset.order_by().aggregate(count=Count('pk'), **aggregates)
+    key = f'{request.user.pk}:{request.get_full_path()}:{sorted(state.items())}'
+    return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def user_conversations(request):
+    return Conversation.objects.filter(conversation_participants__user=request.user)
+
+
+def conversation_list_etag(request, *args, **kwargs):
+    return list_etag(
+        request,
+        user_conversations(request),
+        updated_at=Max('updated_at'),
+        last_message_at=Max('last_message_at'),
+        messages=Sum('message_count'),
+        participants=Sum('participant_count'),
+    )
+
+
+@method_decorator(condition(etag_func=conversation_list_etag), name='get')
 class ConversationListCreateView(generics.ListCreateAPIView):
-    def get(self, request): return Response({'message': 'Conversations'}, status=status.HTTP_200_OK)
+    """List the user's conversations or start a new one."""
+    serializer_class = ConversationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # Participants are prefetched for display_name (Conversation.__str__);
+        # the related object is joined in through its explicit foreign key
+        return user_conversations(self.request).select_related(
+            'created_by', 'project', 'milestone__project', 'inspection_report'
+        ).prefetch_related(
+            Prefetch('participants', queryset=User.objects.only('id', 'first_name', 'last_name', 'username')),
+        )
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+
+def message_queryset():
+    """Messages with everything MessageSerializer reads loaded up front."""
+    # Large columns the serializer never reads stay in the database
+    unused = ['edit_history', 'signature', 'encryption_key_id', 'search_vector']
+    reply_to_unused = ['hashtags', 'attachments', *unused]
+    return Message.objects.select_related('sender', 'reply_to').defer(
+        *unused, *[f'reply_to__{field}' for field in reply_to_unused]
+    ).prefetch_related(
+        # Many-to-many and reverse relations need prefetching; select_related can't follow them.
+        # Only the ids are serialized, so the user and receipt rows stay narrow.
+        Prefetch('mentioned_users', queryset=User.objects.only('id')),
+        Prefetch('read_receipts', queryset=MessageReadReceipt.objects.only('message_id', 'user_id', 'read_at')),
+        'message_attachments',
+    )
+
+
+class MessageCursorPagination(CursorPagination):
+    """
+    Keyset pagination for message timelines, newest first.
+
+    Pages seek on created_at instead of using OFFSET, and no COUNT(*) is run.
+    """
+    page_size = 50
+    ordering = ('-created_at', '-id')
 
-class ConversationDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, conversation_id): return Response({'message': f'Conversation {conversation_id}'}, status=status.HTTP_200_OK)
 
 class MessageListCreateView(generics.ListCreateAPIView):
-    def get(self, request, conversation_id): return Response({'message': 'Messages'}, status=status.HTTP_200_OK)
+    """List messages in a conversation or post a new one."""
+    serializer_class = MessageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MessageCursorPagination
+
+    def get_participant(self):
+        return get_object_or_404(
+            ConversationParticipant,
+            conversation_id=self.kwargs['conversation_id'],
+            user=self.request.user,
+        )
+
+    def get_queryset(self):
+        participant = self.get_participant()
+        return message_queryset().filter(conversation_id=participant.conversation_id)
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'conversation_id': self.kwargs['conversation_id']}
+
+    def perform_create(self, serializer):
+        participant = self.get_participant()
+        if not participant.can_send_messages or participant.status != ConversationParticipant.Status.ACTIVE:
+            raise PermissionDenied("You can't send messages in this conversation.")
+        message = serializer.save(conversation_id=participant.conversation_id, sender=self.request.user)
+        notify_new_message(message)
+
 
 class MessageDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, message_id): return Response({'message': f'Message {message_id}'}, status=status.HTTP_200_OK)
+    """Retrieve, edit or delete a message."""
+    serializer_class = MessageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = 'id'
+    lookup_url_kwarg = 'message_id'
+
+    def get_queryset(self):
+        return message_queryset().filter(conversation__conversation_participants__user=self.request.user)
+
+    def perform_update(self, serializer):
+        # Only the sender can edit a message
+        if serializer.instance.sender_id != self.request.user.id:
+            raise PermissionDenied("Only the sender can edit this message.")
+        serializer.save(edited=True, edited_at=timezone.now())
+
+    def perform_destroy(self, instance):
+        # Only the sender can delete a message
+        if instance.sender_id != self.request.user.id:
+            raise PermissionDenied("Only the sender can delete this message.")
+        instance.delete()
 
-class ParticipantListView(generics.ListAPIView):
-    def get(self, request, conversation_id): return Response({'message': 'Participants'}, status=status.HTTP_200_OK)
 
 class MarkMessageReadView(APIView):
-    def post(self, request, message_id): return Response({'message': 'Message marked as read'}, status=status.HTTP_200_OK)
+    """
+    Mark a message as read, plus any others listed in "message_ids".
 
-class AttachmentListCreateView(generics.ListCreateAPIView):
-    def get(self, request): return Response({'message': 'Attachments'}, status=status.HTTP_200_OK)
+    Receipts for a whole screen of messages are written in one batch.
+    """
+    permission_classes = [permissions.IsAuthenticated]
 
-class AttachmentDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, attachment_id): return Response({'message': f'Attachment {attachment_id}'}, status=status.HTTP_200_OK)
+    def post(self, request, message_id):
+        serializer = MarkMessagesReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        requested = {message_id, *serializer.validated_data.get('message_ids', [])}
 
-class NotificationListView(generics.ListAPIView):
-    def get(self, request): return Response({'message': 'Notifications'}, status=status.HTTP_200_OK)
+        # Only messages in the user's own conversations
+        message_ids = list(Message.objects.filter(
+            pk__in=requested,
+            conversation__conversation_participants__user=request.user,
+        ).values_list('pk', flat=True))
+        if message_id not in message_ids:
+            return Response({'error': 'Message not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        Message.mark_many_as_read(message_ids, request.user)
+        return Response({'message': 'Messages marked as read', 'count': len(message_ids)}, status=status.HTTP_200_OK)
 
-class NotificationDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, notification_id): return Response({'message': f'Notification {notification_id}'}, status=status.HTTP_200_OK)
 
-class MarkNotificationReadView(APIView):
-    def post(self, request, notification_id): return Response({'message': 'Notification marked as read'}, status=status.HTTP_200_OK)
+def user_notifications(request):
+    queryset = Notification.objects.filter(recipient=request.user)
+    if request.GET.get('unread', '').lower() in ('1', 'true'):
+        # Served by the notif_unread_idx partial index
+        queryset = queryset.filter(status__in=Notification.UNREAD_STATUSES)
+    project_id = request.GET.get('project')
+    if project_id:
+        # Same expression as the notif_project_idx index
+        queryset = queryset.filter(metadata__project_id=project_id)
+    return queryset
+
+
+def notification_list_etag(request, *args, **kwargs):
+    return list_etag(request, user_notifications(request), updated_at=Max('updated_at'))
+
+
+@method_decorator(condition(etag_func=notification_list_etag), name='get')
+class NotificationListView(generics.ListAPIView):
+    """List the user's notifications, or only the unread ones with ?unread=1."""
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return user_notifications(self.request).select_related('content_type').prefetch_related(
+            related_object_prefetch()
+        )
 
-class NotificationPreferencesView(generics.RetrieveUpdateAPIView):
-    def get(self, request): return Response({'message': 'Notification preferences'}, status=status.HTTP_200_OK)
 
 class UnreadCountView(APIView):
-    def get(self, request): return Response({'message': 'Unread count'}, status=status.HTTP_200_OK)
+    """Unread message and notification counts for the current user."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(get_unread_counts(request.user), status=status.HTTP_200_OK)
+
+
+class MessageSearchView(generics.ListAPIView):
+    """Search messages in the user's conversations with ?q=."""
+    serializer_class = MessageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MessageCursorPagination
 
-class MessageSearchView(APIView):
-    def get(self, request): return Response({'message': 'Message search'}, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            return Message.objects.none()
+        queryset = message_queryset().filter(conversation__conversation_participants__user=self.request.user)
+        if connection.vendor == 'postgresql':
+            # Served by the GIN index on the trigger-maintained search_vector
+            return queryset.filter(search_vector=SearchQuery(query, config='english'))
+        return queryset.filter(plain_content__icontains=query)
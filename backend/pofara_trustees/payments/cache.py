@@ -0,0 +1,50 @@
+"""
+Cached financial report responses for the payments app.
+
+Entries are keyed by a per-user generation token instead of being deleted
+one by one: bumping the token orphans every cached response for that user,
+which then simply expires. This works the same on Redis and on LocMemCache.
+"""
+
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+ANALYTICS_TIMEOUT = 60 * 60
+ANALYTICS_GENERATION_KEY = 'analytics:{}:generation'
+
+# The report fields that decide what a generated report contains
+REPORT_PARAMS = ('report_type', 'project', 'period_start', 'period_end', 'currency', 'file_format')
+
+
+def _generation(user_id):
+    return cache.get_or_set(
+        ANALYTICS_GENERATION_KEY.format(user_id), lambda: uuid.uuid4().hex, ANALYTICS_TIMEOUT
+    )
+
+
+def report_list_key(request):
+    """Key for one page of the user's report list, e.g. with ?page= or ?fields=."""
+    path = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+    return f'analytics:{request.user.pk}:{_generation(request.user.pk)}:financial_reports:{path}'
+
+
+def generated_report_key(report):
+    """Key for a report generated from the same parameters, saved or not."""
+    parts = ':'.join(str(report.serializable_value(name) or '') for name in REPORT_PARAMS)
+    digest = hashlib.md5(parts.encode(), usedforsecurity=False).hexdigest()
+    return f'analytics:{report.user_id}:{_generation(report.user_id)}:{report.report_type}:{digest}'
+
+
+def invalidate_analytics(user_ids):
+    """
+    Drop cached report responses after the users' financial data changes.
+
+    The tokens are dropped once the current transaction commits, so a
+    concurrent request can't cache a report of the old data under the new one.
+    """
+    keys = [ANALYTICS_GENERATION_KEY.format(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
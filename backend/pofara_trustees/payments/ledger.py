@@ -0,0 +1,117 @@
+"""
+Batched ledger writes for the payments app.
+
+Rows are built in memory and inserted with bulk_create, so recording N
+entries costs a handful of multi-row INSERTs instead of N round trips.
+"""
+
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from projects.models import Project
+from .cache import invalidate_analytics
+from .models import EscrowAccount, EscrowTransaction, Transaction
+from .money import money, money_context
+
+BATCH_SIZE = 500
+
+# Escrow states nothing can be released from
+LOCKED_STATUSES = (EscrowAccount.Status.DISPUTED, EscrowAccount.Status.REFUNDED, EscrowAccount.Status.CLOSED)
+
+
+def new_transaction_number():
+    return f"TXN-{uuid.uuid4().hex[:12].upper()}"
+
+
+def record_provider_transactions(provider_name, records):
+    """
+    Insert the transactions reported by a payment provider.
+
+    Each record is a dict of Transaction field values including
+    provider_transaction_id; net_amount defaults to amount less fee_amount.
+    Rows that conflict with an existing one are skipped by the database, so
+    replayed deliveries are harmless. Because of that, database-set columns
+    such as created_at aren't read back onto the returned objects.
+    """
+    transactions = []
+    with money_context():
+        for record in records:
+            record = {**record, 'amount': money(record['amount']), 'fee_amount': money(record.get('fee_amount', 0))}
+            record.setdefault('net_amount', record['amount'] - record['fee_amount'])
+            transactions.append(
+                Transaction(transaction_number=new_transaction_number(), provider_name=provider_name, **record)
+            )
+    created = Transaction.objects.bulk_create(transactions, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    # bulk_create sends no post_save; this covers what the Transaction signal would
+    user_ids = {user_id for tx in transactions for user_id in (tx.payer_id, tx.payee_id)}
+    project_ids = {tx.project_id for tx in transactions if tx.project_id}
+    if project_ids:
+        user_ids.update(Project.objects.filter(pk__in=project_ids).values_list('owner_id', flat=True))
+    invalidate_analytics(user_ids)
+    return created
+
+
+def release_escrow_funds(account, releases, approved_by, reason=''):
+    """
+    Release several milestone payments from an escrow account at once.
+
+    `releases` is a list of (milestone, amount) pairs. The ledger rows,
+    the escrow entries and the account balances are written in a single
+    atomic block; the account row is locked so concurrent releases can't
+    overdraw it.
+    """
+    with money_context():
+        releases = [(milestone, money(amount)) for milestone, amount in releases]
+        total = sum(amount for _, amount in releases)
+    now = timezone.now()
+
+    with transaction.atomic():
+        account = EscrowAccount.objects.select_for_update().get(pk=account.pk)
+        if account.status in LOCKED_STATUSES:
+            raise ValidationError(f"Funds can't be released from a {account.get_status_display().lower()} escrow account.")
+        if total > account.available_balance:
+            raise ValidationError("Release exceeds the available escrow balance.")
+
+        ledger = []
+        entries = []
+        for milestone, amount in releases:
+            ledger_row = Transaction(
+                transaction_number=new_transaction_number(),
+                transaction_type=Transaction.TransactionType.ESCROW_RELEASE,
+                status=Transaction.Status.COMPLETED,
+                payer_id=account.depositor_id,
+                payee_id=account.beneficiary_id,
+                currency=account.currency,
+                amount=amount,
+                net_amount=amount,
+                project_id=account.project_id,
+                milestone=milestone,
+                description=f"Escrow release from {account.account_number}",
+                processed_at=now,
+            )
+            ledger.append(ledger_row)
+            entries.append(EscrowTransaction(
+                escrow_account=account,
+                transaction=ledger_row,
+                transaction_type=EscrowTransaction.TransactionType.RELEASE,
+                amount=amount,
+                milestone=milestone,
+                release_reason=reason,
+                approved_by=approved_by,
+                approved_at=now,
+            ))
+        Transaction.objects.bulk_create(ledger, batch_size=BATCH_SIZE)
+        EscrowTransaction.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+
+        account.available_balance -= total
+        account.released_amount += total
+        account.status = (
+            EscrowAccount.Status.FULLY_RELEASED if not account.available_balance
+            else EscrowAccount.Status.PARTIALLY_RELEASED
+        )
+        account.save(update_fields=['available_balance', 'released_amount', 'status', 'updated_at'])
+    invalidate_analytics([account.depositor_id, account.beneficiary_id])
+    return entries
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='dispute',
+            name='disputes_defenda_c6cb72_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoices_issued__9a5ea9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_payer_i_7118ce_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_transac_ddda52_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_status_505a2f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_project_a4d612_idx',
+        ),
+        migrations.AddIndex(
+            model_name='dispute',
+            index=models.Index(fields=['defendant', 'status', '-created_at'], name='disputes_defenda_9a6d89_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['issued_to', 'status', 'due_date'], name='invoices_issued__31c8ea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['payer', 'transaction_type', '-created_at'], name='transaction_payer_i_d3956d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['payee', 'transaction_type', '-created_at'], name='transaction_payee_i_207f14_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['project', 'status', '-created_at'], name='transaction_project_3b4397_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['status', '-created_at'], name='transaction_status_b84006_idx'),
+        ),
+    ]
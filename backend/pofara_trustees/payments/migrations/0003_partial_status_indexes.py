@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_transaction_composite_indexes'),
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dispute',
+            index=models.Index(condition=models.Q(('status__in', ['open', 'under_review', 'awaiting_response'])), fields=['status', 'due_date'], name='disp_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(condition=models.Q(('status__in', ['paid', 'cancelled', 'refunded']), _negated=True), fields=['issued_to', 'due_date'], name='inv_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentmethod',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['user'], name='pm_active_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:22
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def keep_latest_default(apps, schema_editor):
+    # Users with several defaults keep only the most recently updated one
+    PaymentMethod = apps.get_model('payments', 'PaymentMethod')
+    db_alias = schema_editor.connection.alias
+    defaults = PaymentMethod.objects.using(db_alias).filter(is_default=True)
+    latest = defaults.filter(user=OuterRef('user')).order_by('-updated_at', '-created_at').values('pk')[:1]
+    defaults.exclude(pk=Subquery(latest)).update(is_default=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_partial_status_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='paymentmethod',
+            name='payment_met_is_defa_11be74_idx',
+        ),
+        migrations.RunPython(keep_latest_default, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='paymentmethod',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('user',), name='one_default_pm_per_user'),
+        ),
+    ]
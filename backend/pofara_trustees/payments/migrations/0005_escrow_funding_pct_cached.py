@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_funding_pct(apps, schema_editor):
+    # Same formula as EscrowAccount.update_funding_percentage
+    EscrowAccount = apps.get_model('payments', 'EscrowAccount')
+    db_alias = schema_editor.connection.alias
+    accounts = EscrowAccount.objects.using(db_alias).exclude(total_amount=0).only(
+        'pk', 'total_amount', 'available_balance'
+    )
+    batch = []
+    for account in accounts.iterator(chunk_size=1000):
+        account.funding_pct_cached = min(int(account.available_balance * 100 / account.total_amount), 100)
+        batch.append(account)
+    EscrowAccount.objects.using(db_alias).bulk_update(batch, ['funding_pct_cached'], batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_one_default_payment_method'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='escrowaccount',
+            name='funding_pct_cached',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Whole funding percentage (capped at 100), refreshed on deposit and release'),
+        ),
+        migrations.RunPython(fill_funding_pct, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='escrowaccount',
+            index=models.Index(fields=['funding_pct_cached'], name='escrow_acco_funding_1f7688_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:32
+
+from django.db import migrations
+
+from pofara_trustees.db import RunPostgresSQL
+
+
+def brin_index(table):
+    # created_at only grows on these append-mostly tables, so a BRIN index
+    # answers time-range scans at a fraction of a btree's size
+    return RunPostgresSQL(
+        sql=f'CREATE INDEX IF NOT EXISTS {table}_created_brin ON {table} USING brin (created_at) WITH (pages_per_range = 32);',
+        reverse_sql=f'DROP INDEX IF EXISTS {table}_created_brin;',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_escrow_funding_pct_cached'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='financialreport',
+            name='financial_r_created_679fd3_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='invoice',
+            name='invoices_created_bfa8ab_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_created_5c02ac_idx',
+        ),
+        brin_index('transactions'),
+        brin_index('invoices'),
+        brin_index('financial_reports'),
+    ]
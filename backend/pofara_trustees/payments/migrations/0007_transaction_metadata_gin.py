@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-15 23:35
+
+from django.db import migrations
+
+from pofara_trustees.db import RunPostgresSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_created_at_brin_indexes'),
+    ]
+
+    operations = [
+        # Containment filters such as metadata__contains={'provider': 'stripe'}
+        # (TransactionQuerySet.matching_metadata)
+        RunPostgresSQL(
+            sql='CREATE INDEX IF NOT EXISTS transactions_metadata_gin ON transactions USING gin (metadata jsonb_path_ops);',
+            reverse_sql='DROP INDEX IF EXISTS transactions_metadata_gin;',
+        ),
+    ]
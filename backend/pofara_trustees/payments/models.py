@@ -3,7 +3,8 @@ Payment and financial management models for the Pofara Trustees platform.
 Includes payment processing, escrow services, invoices, and financial tracking.
 """
 
-from django.db import models
+from django.db import connections, models
+from django.db.models.functions import Cast, Now, Round
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -73,7 +74,7 @@ class PaymentMethod(models.Model):
     # Security
     fingerprint = models.CharField(max_length=64, blank=True, help_text="Unique fingerprint for fraud detection")
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -82,12 +83,76 @@ class PaymentMethod(models.Model):
         verbose_name_plural = 'Payment Methods'
         indexes = [
             models.Index(fields=['user', 'status']),
+            # Small partial index for the usable methods of a user
+            models.Index(fields=['user'], name='pm_active_idx', condition=models.Q(status='active')),
             models.Index(fields=['method_type']),
-            models.Index(fields=['is_default']),
+        ]
+        constraints = [
+            # At most one default method per user; also the index behind
+            # the "default method for user" lookup
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(is_default=True),
+                name='one_default_pm_per_user',
+            ),
         ]
     
     def __str__(self):
-        return f"{self.get_method_type_display()} ending in {self.last_four_digits}"
+        return f"{_METHOD_TYPE_DISPLAY.get(self.method_type, self.method_type)} ending in {self.last_four_digits}"
+
+
+# Choice labels for __str__, looked up once instead of per call
+_METHOD_TYPE_DISPLAY = dict(PaymentMethod.MethodType.choices)
+
+
+class TransactionQuerySet(models.QuerySet):
+    """
+    Transaction status changes written as a single UPDATE.
+    
+    Only the status columns are touched, so the metadata JSON and the other
+    wide columns are never rewritten.
+    """
+    
+    def _invalidate_analytics(self):
+        # update() sends no post_save, so drop the cached reports the signal
+        # would: the parties' and, as project reports cover every transaction
+        # on the project, the project owners'
+        from projects.models import Project
+        from .cache import invalidate_analytics
+        rows = list(self.values_list('payer_id', 'payee_id', 'project_id'))
+        user_ids = {user_id for payer_id, payee_id, _ in rows for user_id in (payer_id, payee_id)}
+        project_ids = {project_id for _, _, project_id in rows if project_id}
+        if project_ids:
+            user_ids.update(Project.objects.filter(pk__in=project_ids).values_list('owner_id', flat=True))
+        invalidate_analytics(user_ids)
+    
+    def mark_completed(self):
+        now = timezone.now()
+        self._invalidate_analytics()
+        return self.update(status=Transaction.Status.COMPLETED, processed_at=now, updated_at=now)
+    
+    def matching_metadata(self, **values):
+        """
+        Transactions whose metadata contains all the given key/value pairs.
+        
+        Written as a containment (@>) filter on PostgreSQL, which
+        transactions_metadata_gin serves; metadata__key=value lookups can't
+        use that index. Other databases lack containment and get the key lookups.
+        """
+        if connections[self.db].vendor == 'postgresql':
+            return self.filter(metadata__contains=values)
+        return self.filter(**{f'metadata__{key}': value for key, value in values.items()})
+    
+    def mark_failed(self, failure_code='', failure_message=''):
+        now = timezone.now()
+        self._invalidate_analytics()
+        return self.update(
+            status=Transaction.Status.FAILED,
+            failure_code=failure_code,
+            failure_message=failure_message,
+            processed_at=now,
+            updated_at=now,
+        )
 
 
 class Transaction(models.Model):
@@ -131,6 +196,13 @@ class Transaction(models.Model):
     # Financial details
     currency = models.CharField(max_length=3, default='USD', help_text="Currency code (ISO 4217)")
     amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="Transaction amount")
+    # Integer copy of amount for report sums; BIGINT addition is much cheaper than NUMERIC.
+    # Rounded before the cast: SQLite multiplies as REAL and CAST truncates (19.99 -> 1998)
+    amount_cents = models.GeneratedField(
+        expression=Cast(Round(models.F('amount') * 100), models.BigIntegerField()),
+        output_field=models.BigIntegerField(),
+        db_persist=True,
+    )
     fee_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, help_text="Platform fee")
     net_amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="Net amount after fees")
     
@@ -203,27 +275,69 @@ class Transaction(models.Model):
     # Metadata
     metadata = models.JSONField(default=dict, blank=True, help_text="Additional transaction metadata")
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TransactionQuerySet.as_manager()
+    
     class Meta:
         db_table = 'transactions'
         verbose_name = 'Transaction'
         verbose_name_plural = 'Transactions'
         indexes = [
             models.Index(fields=['transaction_number']),
-            models.Index(fields=['payer', 'status']),
+            # Composite indexes matching the list filters plus newest-first ordering;
+            # status and project lookups use their leading columns. Filtering on
+            # transaction_type alone is rare and left unindexed on purpose.
+            models.Index(fields=['payer', 'transaction_type', '-created_at']),
+            models.Index(fields=['payee', 'transaction_type', '-created_at']),
             models.Index(fields=['payee', 'status']),
-            models.Index(fields=['transaction_type']),
-            models.Index(fields=['status']),
-            models.Index(fields=['project']),
-            models.Index(fields=['created_at']),
+            models.Index(fields=['project', 'status', '-created_at']),
+            models.Index(fields=['status', '-created_at']),
+            # created_at range scans use a BRIN index on PostgreSQL (added in a migration)
             models.Index(fields=['processed_at']),
         ]
+        constraints = [
+            # A provider's transaction is recorded once; replayed webhook
+            # deliveries are dropped by the database (see ledger.record_provider_transactions)
+            models.UniqueConstraint(
+                fields=['provider_name', 'provider_transaction_id'],
+                condition=~models.Q(provider_transaction_id=''),
+                name='uniq_provider_tx',
+            ),
+        ]
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.transaction_number}: {self.get_transaction_type_display()} - {self.amount} {self.currency}"
+        return f"{self.transaction_number}: {_TX_TYPE_DISPLAY.get(self.transaction_type, self.transaction_type)} - {self.amount} {self.currency}"
+
+
+_TX_TYPE_DISPLAY = dict(Transaction.TransactionType.choices)
+
+
+class EscrowAccountQuerySet(models.QuerySet):
+    """Escrow account queries with the funding figures computed in SQL."""
+    
+    def with_funding(self):
+        """
+        Annotate `funding_pct` and `fully_funded`, the SQL forms of
+        EscrowAccount.funding_percentage and is_fully_funded.
+        """
+        return self.annotate(
+            funding_pct=Cast(
+                models.Case(
+                    models.When(total_amount=0, then=models.Value(0.0)),
+                    # The float factor keeps SQLite from doing integer division
+                    default=models.F('available_balance') * models.Value(100.0) / models.F('total_amount'),
+                    output_field=models.FloatField(),
+                ),
+                models.DecimalField(max_digits=8, decimal_places=4),
+            ),
+            fully_funded=models.ExpressionWrapper(
+                models.Q(available_balance__gte=models.F('total_amount')),
+                output_field=models.BooleanField(),
+            ),
+        )
 
 
 class EscrowAccount(models.Model):
@@ -264,6 +378,10 @@ class EscrowAccount(models.Model):
     available_balance = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     reserved_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     released_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    funding_pct_cached = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Whole funding percentage (capped at 100), refreshed on deposit and release"
+    )
     
     # Terms and conditions
     terms = models.TextField(help_text="Escrow terms and conditions")
@@ -289,9 +407,11 @@ class EscrowAccount(models.Model):
     maturity_date = models.DateField(null=True, blank=True)
     closed_at = models.DateTimeField(null=True, blank=True)
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = EscrowAccountQuerySet.as_manager()
+    
     class Meta:
         db_table = 'escrow_accounts'
         verbose_name = 'Escrow Account'
@@ -303,11 +423,20 @@ class EscrowAccount(models.Model):
             models.Index(fields=['project']),
             models.Index(fields=['status']),
             models.Index(fields=['maturity_date']),
+            models.Index(fields=['funding_pct_cached']),
         ]
     
     def __str__(self):
         return f"Escrow {self.account_number} - {self.project.title}"
     
+    def save(self, *args, **kwargs):
+        # funding_pct_cached only backs the funding filters; keep it in step with the balances
+        self.funding_pct_cached = self.calculate_funding_pct()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'available_balance', 'total_amount'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'funding_pct_cached'}
+        super().save(*args, **kwargs)
+    
     @property
     def is_fully_funded(self):
         """Check if escrow is fully funded."""
@@ -315,10 +444,24 @@ class EscrowAccount(models.Model):
     
     @property
     def funding_percentage(self):
-        """Calculate funding percentage."""
+        """Calculate funding percentage (uses the with_funding() annotation when present)."""
+        if hasattr(self, 'funding_pct'):
+            return self.funding_pct
         if self.total_amount == 0:
             return 0
         return (self.available_balance / self.total_amount) * 100
+    
+    def calculate_funding_pct(self):
+        """Whole funding percentage from the current balances, capped at 100."""
+        if not self.total_amount:
+            return 0
+        # Unsaved accounts may still hold the float field defaults
+        return min(int(Decimal(self.available_balance) * 100 / Decimal(self.total_amount)), 100)
+    
+    def update_funding_percentage(self):
+        """Refresh the stored funding percentage; call after a deposit or release."""
+        self.funding_pct_cached = self.calculate_funding_pct()
+        self.save(update_fields=['funding_pct_cached', 'updated_at'])
 
 
 class EscrowTransaction(models.Model):
@@ -369,7 +512,7 @@ class EscrowTransaction(models.Model):
         related_name='escrow_transactions'
     )
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
     
     class Meta:
         db_table = 'escrow_transactions'
@@ -384,7 +527,34 @@ class EscrowTransaction(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.get_transaction_type_display()} - {self.amount} {self.escrow_account.currency}"
+        return f"{_ESCROW_TX_TYPE_DISPLAY.get(self.transaction_type, self.transaction_type)} - {self.amount} {self.escrow_account.currency}"
+
+
+_ESCROW_TX_TYPE_DISPLAY = dict(EscrowTransaction.TransactionType.choices)
+
+
+class InvoiceQuerySet(models.QuerySet):
+    """Invoice queries that keep the overdue check in SQL."""
+    
+    def _overdue_q(self):
+        return ~models.Q(status__in=Invoice.SETTLED_STATUSES) & models.Q(due_date__lt=timezone.now().date())
+    
+    def with_overdue(self):
+        """Annotate each invoice with `overdue`, the SQL form of Invoice.is_overdue."""
+        return self.annotate(overdue=models.ExpressionWrapper(self._overdue_q(), output_field=models.BooleanField()))
+    
+    def past_due(self):
+        """Only the overdue invoices; a plain WHERE that inv_unpaid_idx can serve."""
+        return self.filter(self._overdue_q())
+    
+    def with_outstanding(self):
+        """Annotate `outstanding`, the SQL form of Invoice.outstanding_amount."""
+        return self.annotate(
+            outstanding=models.ExpressionWrapper(
+                models.F('total_amount') - models.F('paid_amount'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
 
 
 class Invoice(models.Model):
@@ -402,6 +572,8 @@ class Invoice(models.Model):
         CANCELLED = 'cancelled', 'Cancelled'
         REFUNDED = 'refunded', 'Refunded'
     
+    SETTLED_STATUSES = [Status.PAID, Status.CANCELLED, Status.REFUNDED]
+    
     class InvoiceType(models.TextChoices):
         PROJECT_PAYMENT = 'project_payment', 'Project Payment'
         MILESTONE_PAYMENT = 'milestone_payment', 'Milestone Payment'
@@ -470,9 +642,11 @@ class Invoice(models.Model):
     notes = models.TextField(blank=True, help_text="Internal notes")
     public_notes = models.TextField(blank=True, help_text="Notes visible to customer")
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = InvoiceQuerySet.as_manager()
+    
     class Meta:
         db_table = 'invoices'
         verbose_name = 'Invoice'
@@ -480,28 +654,54 @@ class Invoice(models.Model):
         indexes = [
             models.Index(fields=['invoice_number']),
             models.Index(fields=['issued_by']),
-            models.Index(fields=['issued_to']),
+            models.Index(fields=['issued_to', 'status', 'due_date']),
+            # Partial index over the invoices still awaiting payment
+            models.Index(
+                fields=['issued_to', 'due_date'],
+                name='inv_unpaid_idx',
+                condition=~models.Q(status__in=['paid', 'cancelled', 'refunded']),
+            ),
             models.Index(fields=['status']),
             models.Index(fields=['due_date']),
             models.Index(fields=['project']),
-            models.Index(fields=['created_at']),
+            # created_at range scans use a BRIN index on PostgreSQL (added in a migration)
         ]
         ordering = ['-created_at']
     
     def __str__(self):
         return f"{self.invoice_number}: {self.title}"
     
+    def record_payment(self, amount):
+        """
+        Add a payment to paid_amount, marking the invoice paid once it is covered.
+        
+        The sum is done in the UPDATE itself so concurrent payments can't
+        overwrite each other, and only the payment columns are written.
+        """
+        now = timezone.now()
+        paid_amount = models.F('paid_amount') + amount
+        covered = models.Q(total_amount__lte=paid_amount)
+        Invoice.objects.filter(pk=self.pk).update(
+            paid_amount=paid_amount,
+            status=models.Case(models.When(covered, then=models.Value(self.Status.PAID)), default=models.F('status')),
+            paid_at=models.Case(models.When(covered, then=models.Value(now)), default=models.F('paid_at')),
+            updated_at=now,
+        )
+        self.refresh_from_db(fields=['paid_amount', 'status', 'paid_at', 'updated_at'])
+        from .cache import invalidate_analytics
+        invalidate_analytics([self.issued_by_id, self.issued_to_id])
+    
     @property
     def is_overdue(self):
-        """Check if invoice is overdue."""
+        """Check if invoice is overdue (see InvoiceQuerySet.with_overdue for querysets)."""
         return (
-            self.status not in [self.Status.PAID, self.Status.CANCELLED, self.Status.REFUNDED] and
+            self.status not in self.SETTLED_STATUSES and
             timezone.now().date() > self.due_date
         )
     
     @property
     def outstanding_amount(self):
-        """Calculate outstanding amount."""
+        """Calculate outstanding amount (see InvoiceQuerySet.with_outstanding for querysets)."""
         return self.total_amount - self.paid_amount
 
 
@@ -529,6 +729,8 @@ class Dispute(models.Model):
         CLOSED = 'closed', 'Closed'
         CANCELLED = 'cancelled', 'Cancelled'
     
+    OPEN_STATUSES = [Status.OPEN, Status.UNDER_REVIEW, Status.AWAITING_RESPONSE]
+    
     class Resolution(models.TextChoices):
         FAVOR_PLAINTIFF = 'favor_plaintiff', 'In Favor of Plaintiff'
         FAVOR_DEFENDANT = 'favor_defendant', 'In Favor of Defendant'
@@ -599,7 +801,7 @@ class Dispute(models.Model):
     escalated_at = models.DateTimeField(null=True, blank=True)
     closed_at = models.DateTimeField(null=True, blank=True)
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -609,10 +811,16 @@ class Dispute(models.Model):
         indexes = [
             models.Index(fields=['dispute_number']),
             models.Index(fields=['plaintiff']),
-            models.Index(fields=['defendant']),
+            models.Index(fields=['defendant', 'status', '-created_at']),
             models.Index(fields=['status']),
             models.Index(fields=['dispute_type']),
             models.Index(fields=['due_date']),
+            # Partial index for the open-dispute queue ordered by response deadline
+            models.Index(
+                fields=['status', 'due_date'],
+                name='disp_open_idx',
+                condition=models.Q(status__in=['open', 'under_review', 'awaiting_response']),
+            ),
             models.Index(fields=['created_at']),
         ]
         ordering = ['-created_at']
@@ -690,7 +898,7 @@ class FinancialReport(models.Model):
     generated_at = models.DateTimeField(null=True, blank=True)
     expires_at = models.DateTimeField(null=True, blank=True)
     
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(db_default=Now(), editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -702,9 +910,12 @@ class FinancialReport(models.Model):
             models.Index(fields=['user', 'report_type']),
             models.Index(fields=['status']),
             models.Index(fields=['period_start', 'period_end']),
-            models.Index(fields=['created_at']),
+            # created_at range scans use a BRIN index on PostgreSQL (added in a migration)
         ]
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.report_number}: {self.get_report_type_display()}"
+        return f"{self.report_number}: {_REPORT_TYPE_DISPLAY.get(self.report_type, self.report_type)}"
+
+
+_REPORT_TYPE_DISPLAY = dict(FinancialReport.ReportType.choices)
@@ -0,0 +1,26 @@
+"""
+Rounding helpers for monetary amounts.
+"""
+
+from decimal import ROUND_HALF_UP, Context, Decimal, localcontext
+
+MONEY_Q = Decimal('0.01')
+
+# Amount columns hold at most 15 digits, so 18 significant digits are plenty
+# and keep Decimal arithmetic cheaper than the default 28
+MONEY_CONTEXT = Context(prec=18, rounding=ROUND_HALF_UP)
+
+
+def money(value):
+    """Round to cents, halves away from zero (commercial rounding, not banker's)."""
+    return Decimal(value).quantize(MONEY_Q, context=MONEY_CONTEXT)
+
+
+def cents_to_money(cents):
+    """Exact amount for a whole number of cents, e.g. a Sum('amount_cents')."""
+    return None if cents is None else Decimal(cents).scaleb(-2)
+
+
+def money_context():
+    """Scope MONEY_CONTEXT over a block of amount arithmetic, e.g. a batch loop."""
+    return localcontext(MONEY_CONTEXT)
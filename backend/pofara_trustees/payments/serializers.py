@@ -0,0 +1,236 @@
+"""
+Serializers for payments app.
+"""
+
+import uuid
+from decimal import Decimal
+
+from rest_framework import serializers
+
+from projects.models import ProjectMilestone
+
+from .models import Dispute, EscrowAccount, EscrowTransaction, FinancialReport, Invoice, Transaction
+
+
+class TransactionListSerializer(serializers.ModelSerializer):
+    """Serializer for transaction lists."""
+
+    class Meta:
+        model = Transaction
+        fields = [
+            'id', 'transaction_number', 'transaction_type', 'status',
+            'payer', 'payee', 'currency', 'amount', 'fee_amount', 'net_amount',
+            'payment_method', 'project', 'milestone', 'invoice',
+            'description', 'reference_number', 'processed_at', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class InvoiceListSerializer(serializers.ModelSerializer):
+    """Serializer for invoice lists."""
+
+    outstanding_amount = serializers.ReadOnlyField()
+    is_overdue = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Invoice
+        fields = [
+            'id', 'invoice_number', 'invoice_type', 'status', 'issued_by',
+            'issued_to', 'project', 'milestone', 'currency', 'subtotal',
+            'tax_amount', 'discount_amount', 'total_amount', 'paid_amount',
+            'outstanding_amount', 'is_overdue', 'title', 'due_date',
+            'sent_at', 'paid_at', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class DisputeListSerializer(serializers.ModelSerializer):
+    """Serializer for dispute lists."""
+
+    class Meta:
+        model = Dispute
+        fields = [
+            'id', 'dispute_number', 'dispute_type', 'status', 'plaintiff',
+            'defendant', 'transaction', 'project', 'title', 'disputed_amount',
+            'currency', 'resolution', 'resolution_amount', 'due_date', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class FinancialReportListSerializer(serializers.ModelSerializer):
+    """Serializer for financial report lists."""
+
+    class Meta:
+        model = FinancialReport
+        fields = [
+            'id', 'report_number', 'report_type', 'status', 'project',
+            'period_start', 'period_end', 'currency', 'file', 'file_format',
+            'generated_at', 'expires_at', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class DisputeSummarySerializer(serializers.ModelSerializer):
+    """Compact dispute entry nested in transaction details."""
+
+    class Meta:
+        model = Dispute
+        fields = ['id', 'dispute_number', 'dispute_type', 'status']
+
+
+class TransactionDetailSerializer(serializers.ModelSerializer):
+    """Detailed transaction serializer with the related parties and objects."""
+
+    payer_name = serializers.CharField(source='payer.get_full_name', read_only=True, allow_null=True)
+    payee_name = serializers.CharField(source='payee.get_full_name', read_only=True, allow_null=True)
+    payment_method_display = serializers.CharField(source='payment_method', read_only=True, allow_null=True)
+    project_title = serializers.CharField(source='project.title', read_only=True, allow_null=True)
+    milestone_title = serializers.CharField(source='milestone.title', read_only=True, allow_null=True)
+    invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True, allow_null=True)
+    escrow_account = serializers.UUIDField(source='escrow_transaction.escrow_account_id', read_only=True, allow_null=True)
+    escrow_account_number = serializers.CharField(
+        source='escrow_transaction.escrow_account.account_number', read_only=True, allow_null=True
+    )
+    escrow_transaction_type = serializers.CharField(
+        source='escrow_transaction.transaction_type', read_only=True, allow_null=True
+    )
+    disputes = DisputeSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Transaction
+        # Both parties see this, so the request fingerprint (ip_address,
+        # user_agent), risk_score, metadata and provider ids stay internal
+        fields = [
+            'id', 'transaction_number', 'transaction_type', 'status',
+            'payer', 'payer_name', 'payee', 'payee_name',
+            'currency', 'amount', 'fee_amount', 'net_amount',
+            'exchange_rate', 'original_currency', 'original_amount',
+            'payment_method', 'payment_method_display', 'project', 'project_title',
+            'milestone', 'milestone_title', 'invoice', 'invoice_number',
+            'escrow_account', 'escrow_account_number', 'escrow_transaction_type',
+            'description', 'reference_number', 'failure_code', 'disputes',
+            'processed_at', 'authorized_at', 'captured_at', 'settled_at',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class EscrowAccountSerializer(serializers.ModelSerializer):
+    """Serializer for escrow account lists and details."""
+
+    depositor_name = serializers.CharField(source='depositor.get_full_name', read_only=True)
+    beneficiary_name = serializers.CharField(source='beneficiary.get_full_name', read_only=True)
+    arbitrator_name = serializers.CharField(source='arbitrator.get_full_name', read_only=True, allow_null=True)
+    project_title = serializers.CharField(source='project.title', read_only=True)
+    funding_percentage = serializers.ReadOnlyField()
+    is_fully_funded = serializers.ReadOnlyField()
+
+    class Meta:
+        model = EscrowAccount
+        fields = '__all__'
+
+
+class EscrowTransactionSerializer(serializers.ModelSerializer):
+    """Serializer for the deposits and releases of an escrow account."""
+
+    transaction_number = serializers.CharField(source='transaction.transaction_number', read_only=True)
+    transaction_status = serializers.CharField(source='transaction.status', read_only=True)
+    milestone_title = serializers.CharField(source='milestone.title', read_only=True, allow_null=True)
+    approved_by_name = serializers.CharField(source='approved_by.get_full_name', read_only=True, allow_null=True)
+    dispute_number = serializers.CharField(source='dispute.dispute_number', read_only=True, allow_null=True)
+
+    class Meta:
+        model = EscrowTransaction
+        fields = [
+            'id', 'transaction', 'transaction_number', 'transaction_status',
+            'transaction_type', 'amount', 'milestone', 'milestone_title',
+            'release_reason', 'approved_by', 'approved_by_name', 'approved_at',
+            'dispute', 'dispute_number', 'created_at'
+        ]
+
+
+class EscrowReleaseItemSerializer(serializers.Serializer):
+    """One milestone payment of an escrow release."""
+
+    milestone = serializers.PrimaryKeyRelatedField(
+        queryset=ProjectMilestone.objects.all(), required=False, allow_null=True
+    )
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+
+
+class EscrowReleaseSerializer(serializers.Serializer):
+    """Serializer for releasing one or more payments from an escrow account."""
+
+    releases = EscrowReleaseItemSerializer(many=True, allow_empty=False)
+    reason = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class EscrowAccountDetailSerializer(EscrowAccountSerializer):
+    """Escrow account details including its transaction history."""
+
+    escrow_transactions = EscrowTransactionSerializer(many=True, read_only=True)
+
+
+class InvoiceDetailSerializer(serializers.ModelSerializer):
+    """Detailed invoice serializer with the related parties and objects."""
+
+    issued_by_name = serializers.CharField(source='issued_by.get_full_name', read_only=True)
+    issued_to_name = serializers.CharField(source='issued_to.get_full_name', read_only=True)
+    project_title = serializers.CharField(source='project.title', read_only=True, allow_null=True)
+    milestone_title = serializers.CharField(source='milestone.title', read_only=True, allow_null=True)
+    outstanding_amount = serializers.ReadOnlyField()
+    is_overdue = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Invoice
+        fields = '__all__'
+
+
+class DisputeDetailSerializer(serializers.ModelSerializer):
+    """Detailed dispute serializer with the related parties and objects."""
+
+    plaintiff_name = serializers.CharField(source='plaintiff.get_full_name', read_only=True)
+    defendant_name = serializers.CharField(source='defendant.get_full_name', read_only=True)
+    mediator_name = serializers.CharField(source='mediator.get_full_name', read_only=True, allow_null=True)
+    arbitrator_name = serializers.CharField(source='arbitrator.get_full_name', read_only=True, allow_null=True)
+    transaction_number = serializers.CharField(source='transaction.transaction_number', read_only=True, allow_null=True)
+    project_title = serializers.CharField(source='project.title', read_only=True, allow_null=True)
+
+    class Meta:
+        model = Dispute
+        fields = '__all__'
+
+
+class FinancialReportGenerateSerializer(serializers.ModelSerializer):
+    """Serializer for requesting a new financial report."""
+
+    class Meta:
+        model = FinancialReport
+        fields = [
+            'id', 'report_number', 'report_type', 'status', 'project',
+            'period_start', 'period_end', 'currency', 'file_format', 'created_at'
+        ]
+        read_only_fields = ['id', 'report_number', 'status', 'created_at']
+
+    def validate_project(self, project):
+        if project is not None and project.owner_id != self.context['request'].user.id:
+            raise serializers.ValidationError("Only the project owner can report on a project.")
+        return project
+
+    def validate(self, attrs):
+        if attrs['period_start'] > attrs['period_end']:
+            raise serializers.ValidationError({'period_end': "The period can't end before it starts."})
+        return attrs
+
+    def create(self, validated_data):
+        # The full uuid: a short prefix would eventually collide on the unique column
+        validated_data['report_number'] = f"RPT-{uuid.uuid4().hex.upper()}"
+        return super().create(validated_data)
+
+
+class FinancialReportDetailSerializer(serializers.ModelSerializer):
+    """Detailed financial report serializer including the report data."""
+
+    class Meta:
+        model = FinancialReport
+        exclude = ['access_granted_to']
@@ -0,0 +1,45 @@
+"""
+Signal handlers for the payments app.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from projects.models import Project
+from .cache import invalidate_analytics
+from .models import FinancialReport, Invoice, Transaction
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def invalidate_transaction_analytics(sender, instance, **kwargs):
+    user_ids = [instance.payer_id, instance.payee_id]
+    if instance.project_id:
+        # Project reports cover every transaction on the project
+        user_ids += Project.objects.filter(pk=instance.project_id).values_list('owner_id', flat=True)
+    invalidate_analytics(user_ids)
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+def invalidate_invoice_analytics(sender, instance, **kwargs):
+    invalidate_analytics([instance.issued_by_id, instance.issued_to_id])
+
+
+@receiver(post_save, sender=FinancialReport)
+@receiver(post_delete, sender=FinancialReport)
+def invalidate_report_list(sender, instance, **kwargs):
+    invalidate_analytics([instance.user_id])
+
+
+@receiver(m2m_changed, sender=FinancialReport.access_granted_to.through)
+def invalidate_shared_report_lists(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # Changed from the user's side: instance is the user
+        invalidate_analytics([instance.pk])
+    elif action == 'pre_clear':
+        invalidate_analytics(instance.access_granted_to.values_list('pk', flat=True))
+    else:
+        invalidate_analytics(pk_set)
@@ -0,0 +1,37 @@
+"""
+Celery tasks for the payments app.
+"""
+
+from celery import shared_task
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from .cache import ANALYTICS_TIMEOUT, generated_report_key
+from .models import FinancialReport
+from .reports import build_report
+from .serializers import FinancialReportDetailSerializer
+
+
+@shared_task(ignore_result=True)
+def generate_report(report_id):
+    """
+    Build a requested financial report in the background.
+
+    The report row tracks progress for clients polling its detail endpoint:
+    it is created as generating and ends up ready or failed. Once ready,
+    its details are cached so asking for the same report again is answered
+    straight away.
+    """
+    report = FinancialReport.objects.filter(pk=report_id, status=FinancialReport.Status.GENERATING).first()
+    if report is None:
+        return
+    try:
+        build_report(report)
+    except Exception:
+        FinancialReport.objects.filter(pk=report_id).update(status=FinancialReport.Status.FAILED)
+        raise
+    content = JSONRenderer().render(FinancialReportDetailSerializer(report).data)
+    # Saving the report bumps the user's generation once it commits, so the
+    # key is taken after that
+    transaction.on_commit(lambda: cache.set(generated_report_key(report), content, ANALYTICS_TIMEOUT))
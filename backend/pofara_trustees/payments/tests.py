@@ -1,3 +1,407 @@
-from django.test import TestCase
+import base64
+import datetime
+import hashlib
+import hmac
+import json
+import time
+import zlib
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.x509.oid import NameOID
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from projects.models import Project, ProjectMilestone
+
+from .cache import ANALYTICS_GENERATION_KEY
+from .ledger import record_provider_transactions, release_escrow_funds
+from .models import EscrowAccount, EscrowTransaction, FinancialReport, Invoice, Transaction
+from .webhooks import PAYPAL_CERT_CACHE_KEY, STRIPE_SIGNATURE_TOLERANCE
+
+User = get_user_model()
+
+
+class PaymentsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.payer = User.objects.create_user(username='payer', email='payer@example.com', password='x')
+        cls.payee = User.objects.create_user(username='payee', email='payee@example.com', password='x')
+
+    @classmethod
+    def create_transaction(cls, amount, number, **fields):
+        fields.setdefault('payer', cls.payer)
+        fields.setdefault('payee', cls.payee)
+        return Transaction.objects.create(
+            transaction_number=number,
+            transaction_type=Transaction.TransactionType.PAYMENT,
+            amount=amount,
+            net_amount=amount,
+            description='Test payment',
+            **fields,
+        )
+
+    @classmethod
+    def create_project(cls, owner=None):
+        today = timezone.now().date()
+        return Project.objects.create(
+            project_number=f'P-{Project.objects.count()}', owner=owner or cls.payer, title='Roof',
+            description='Roof repair', project_type=Project._meta.get_field('project_type').choices[0][0],
+            country='GA', city='Libreville', address='1 Rue', total_budget=300,
+            planned_start_date=today, planned_end_date=today,
+        )
+
+    @classmethod
+    def create_escrow_account(cls, **fields):
+        fields.setdefault('project', cls.create_project())
+        return EscrowAccount.objects.create(
+            account_number=f'E-{fields["project"].project_number}', depositor=cls.payer, beneficiary=cls.payee,
+            total_amount=Decimal('300.00'), terms='Terms', **fields,
+        )
+
+
+class AmountCentsTests(PaymentsTestCase):
+    def test_amounts_that_are_not_exact_in_binary(self):
+        amounts = ['0.29', '1.13', '4.35', '19.99', '0.01', '1234567.89']
+        for number, amount in enumerate(amounts):
+            self.create_transaction(Decimal(amount), f'TXN-CENTS-{number}')
+
+        cents = dict(Transaction.objects.values_list('amount', 'amount_cents'))
+        for amount in amounts:
+            self.assertEqual(cents[Decimal(amount)], int(Decimal(amount) * 100))
+        total = Transaction.objects.aggregate(total=Sum('amount_cents'))['total']
+        self.assertEqual(total, sum(int(Decimal(amount) * 100) for amount in amounts))
+
+
+class EscrowFundingTests(PaymentsTestCase):
+    def setUp(self):
+        self.account = self.create_escrow_account(available_balance=Decimal('100.00'))
+
+    def test_funding_percentage_is_exact(self):
+        self.assertEqual(round(self.account.funding_percentage, 4), Decimal('33.3333'))
+        annotated = EscrowAccount.objects.with_funding().get(pk=self.account.pk)
+        self.assertEqual(round(annotated.funding_percentage, 4), Decimal('33.3333'))
+
+    def test_filter_column_follows_the_balances(self):
+        self.assertEqual(self.account.funding_pct_cached, 33)
+        self.account.available_balance = Decimal('300.00')
+        self.account.save(update_fields=['available_balance'])
+        self.assertEqual(EscrowAccount.objects.get(funding_pct_cached__gte=100), self.account)
+
+    def test_update_funding_percentage_bumps_updated_at(self):
+        updated_at = self.account.updated_at
+        EscrowAccount.objects.filter(pk=self.account.pk).update(available_balance=Decimal('150.00'))
+        self.account.refresh_from_db()
+        self.account.update_funding_percentage()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.funding_pct_cached, 50)
+        self.assertGreater(self.account.updated_at, updated_at)
+
+
+class EscrowReleaseTests(PaymentsTestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        self.account = self.create_escrow_account(available_balance=Decimal('300.00'))
+        today = timezone.now().date()
+        self.milestones = [
+            ProjectMilestone.objects.create(
+                project=self.account.project, title=f'Stage {order}', description='Stage', order=order,
+                planned_start_date=today, planned_end_date=today, budget_allocation=Decimal('150.00'),
+            )
+            for order in range(2)
+        ]
+
+    def release(self, *amounts, user=None):
+        self.client.force_authenticate(user or self.payer)
+        releases = [
+            {'milestone': milestone.pk, 'amount': amount} for milestone, amount in zip(self.milestones, amounts)
+        ]
+        return self.client.post(
+            f'/api/v1/payments/escrow/{self.account.pk}/release/', {'releases': releases}, format='json'
+        )
+
+    def test_release_writes_the_ledger_and_balances(self):
+        response = self.release('100.00', '50.00')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 2)
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.available_balance, Decimal('150.00'))
+        self.assertEqual(self.account.released_amount, Decimal('150.00'))
+        self.assertEqual(self.account.status, EscrowAccount.Status.PARTIALLY_RELEASED)
+        self.assertEqual(self.account.funding_pct_cached, 50)
+        released = Transaction.objects.filter(transaction_type=Transaction.TransactionType.ESCROW_RELEASE)
+        self.assertEqual(released.aggregate(total=Sum('amount'))['total'], Decimal('150.00'))
+
+    def test_overdraw_is_rejected_without_writing(self):
+        response = self.release('200.00', '100.01')
+        self.assertEqual(response.status_code, 400)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.available_balance, Decimal('300.00'))
+        self.assertFalse(EscrowTransaction.objects.exists())
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_release_escrow_funds_rejects_overdraw(self):
+        release_escrow_funds(self.account, [(self.milestones[0], '300.00')], self.payer)
+        with self.assertRaises(ValidationError):
+            release_escrow_funds(self.account, [(self.milestones[1], '0.01')], self.payer)
+        self.assertEqual(EscrowTransaction.objects.count(), 1)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.status, EscrowAccount.Status.FULLY_RELEASED)
+
+    def test_only_the_depositor_can_release(self):
+        self.assertEqual(self.release('10.00', user=self.payee).status_code, 404)
+
+    def test_milestones_of_other_projects_are_rejected(self):
+        other = self.create_escrow_account()
+        self.client.force_authenticate(self.payer)
+        response = self.client.post(
+            f'/api/v1/payments/escrow/{other.pk}/release/',
+            {'releases': [{'milestone': self.milestones[0].pk, 'amount': '10.00'}]}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ProviderTransactionTests(PaymentsTestCase):
+    def record(self, **fields):
+        return record_provider_transactions('stripe', [{
+            'provider_transaction_id': 'pi_1',
+            'transaction_type': Transaction.TransactionType.PAYMENT,
+            'payer_id': self.payer.pk,
+            'payee_id': self.payee.pk,
+            'amount': '25.00',
+            'fee_amount': '1.00',
+            'description': 'Provider payment',
+            **fields,
+        }])
+
+    def test_replayed_records_are_dropped(self):
+        self.record()
+        self.record()
+        transaction = Transaction.objects.get()
+        self.assertEqual(transaction.net_amount, Decimal('24.00'))
+        self.assertEqual(transaction.provider_name, 'stripe')
+
+    def test_project_owner_analytics_are_invalidated(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='x')
+        project = self.create_project(owner=owner)
+        key = ANALYTICS_GENERATION_KEY.format(owner.pk)
+        cache.set(key, 'before')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record(project_id=project.pk)
+        self.assertIsNone(cache.get(key))
+
+    def test_status_updates_invalidate_the_project_owner(self):
+        owner = User.objects.create_user(username='owner', email='owner@example.com', password='x')
+        self.create_transaction(Decimal('10.00'), 'TXN-STATUS', project=self.create_project(owner=owner))
+        key = ANALYTICS_GENERATION_KEY.format(owner.pk)
+        for mark in ('mark_completed', 'mark_failed'):
+            cache.set(key, 'before')
+            with self.captureOnCommitCallbacks() as callbacks:
+                getattr(Transaction.objects.all(), mark)()
+            # Not before the commit, or a concurrent request could re-cache the old report
+            self.assertEqual(cache.get(key), 'before')
+            for callback in callbacks:
+                callback()
+            self.assertIsNone(cache.get(key))
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class ReportGenerationTests(PaymentsTestCase):
+    client_class = APIClient
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.payer)
+        self.create_transaction(Decimal('40.00'), 'TXN-REPORT-1')
+
+    def generate(self):
+        today = timezone.now().date()
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/v1/payments/reports/generate/', {
+                'report_type': FinancialReport.ReportType.USER_STATEMENT,
+                'period_start': today.replace(day=1), 'period_end': today,
+            }, format='json')
+
+    def test_generated_then_ready_then_cached(self):
+        response = self.generate()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], FinancialReport.Status.GENERATING)
+        report_id = response.json()['id']
+
+        detail = self.client.get(f'/api/v1/payments/reports/{report_id}/')
+        self.assertEqual(detail.json()['status'], FinancialReport.Status.READY)
+
+        again = self.generate()
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()['id'], report_id)
+        self.assertEqual(FinancialReport.objects.count(), 1)
+
+    def test_new_transactions_regenerate_the_report(self):
+        first = self.generate().json()['id']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_transaction(Decimal('5.00'), 'TXN-REPORT-2')
+        response = self.generate()
+        self.assertEqual(response.status_code, 202)
+        self.assertNotEqual(response.json()['id'], first)
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET='whsec_test')
+class StripeWebhookTests(PaymentsTestCase):
+    url = '/api/v1/payments/webhooks/stripe/'
+
+    def setUp(self):
+        self.invoice = Invoice.objects.create(
+            invoice_number='INV-1', invoice_type=Invoice._meta.get_field('invoice_type').choices[0][0],
+            issued_by=self.payee, issued_to=self.payer, project=self.create_project(), subtotal=25,
+            total_amount=25, title='Stage 1', due_date=timezone.now().date(),
+        )
+
+    def post(self, event, secret='whsec_test', timestamp=None):
+        body = json.dumps(event).encode()
+        timestamp = str(int(time.time()) if timestamp is None else timestamp)
+        signature = hmac.new(secret.encode(), timestamp.encode() + b'.' + body, hashlib.sha256).hexdigest()
+        return self.client.post(
+            self.url, body, content_type='application/json', HTTP_STRIPE_SIGNATURE=f't={timestamp},v1={signature}'
+        )
+
+    def payment_event(self, invoice_number='INV-1', currency='usd', amount=2500):
+        return {'type': 'payment_intent.succeeded', 'data': {'object': {
+            'id': 'pi_1', 'currency': currency, 'amount_received': amount,
+            'metadata': {'invoice_number': invoice_number},
+        }}}
+
+    def test_invoice_payment_is_recorded_once(self):
+        for _ in range(2):
+            self.assertEqual(self.post(self.payment_event()).status_code, 200)
+        transaction = Transaction.objects.get()
+        self.assertEqual(transaction.amount, Decimal('25.00'))
+        self.assertEqual(transaction.currency, 'USD')
+        self.assertEqual((transaction.payer, transaction.payee), (self.payer, self.payee))
+        self.assertEqual(transaction.invoice, self.invoice)
+        self.assertEqual(transaction.status, Transaction.Status.COMPLETED)
+
+    def test_zero_decimal_currency_amounts(self):
+        self.post(self.payment_event(currency='xaf', amount=2500))
+        self.assertEqual(Transaction.objects.get().amount, Decimal('2500.00'))
+
+    def test_payments_of_unknown_invoices_are_ignored(self):
+        self.assertEqual(self.post(self.payment_event(invoice_number='INV-404')).status_code, 200)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_signature_is_checked(self):
+        event = {'type': 'customer.created'}
+        response = self.post(event)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'message': 'Stripe webhook'})
+        self.assertEqual(self.post(event, secret='whsec_other').status_code, 400)
+        response = self.client.post(self.url, json.dumps(event), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_tampered_body_is_rejected(self):
+        timestamp = str(int(time.time()))
+        signature = hmac.new(b'whsec_test', timestamp.encode() + b'.{}', hashlib.sha256).hexdigest()
+        response = self.client.post(
+            self.url, '{"type": "customer.created"}', content_type='application/json',
+            HTTP_STRIPE_SIGNATURE=f't={timestamp},v1={signature}',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_timestamp_tolerance(self):
+        event = {'type': 'customer.created'}
+        now = int(time.time())
+        self.assertEqual(self.post(event, timestamp=now - STRIPE_SIGNATURE_TOLERANCE + 5).status_code, 200)
+        self.assertEqual(self.post(event, timestamp=now - STRIPE_SIGNATURE_TOLERANCE - 5).status_code, 400)
+        self.assertEqual(self.post(event, timestamp=now + STRIPE_SIGNATURE_TOLERANCE + 5).status_code, 400)
+
+
+@override_settings(PAYPAL_WEBHOOK_ID='WH-TEST')
+class PayPalWebhookTests(TestCase):
+    url = '/api/v1/payments/webhooks/paypal/'
+    cert_url = 'https://api.paypal.com/v1/notifications/certs/CERT-1'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'messageverificationcerts.paypal.com')])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        certificate = (
+            x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(cls.key.public_key())
+            .serial_number(1).not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+            .sign(cls.key, hashes.SHA256())
+        )
+        cls.pem = certificate.public_bytes(serialization.Encoding.PEM)
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, cert_url=None, webhook_id='WH-TEST'):
+        body = json.dumps({'event_type': 'CUSTOMER.DISPUTE.CREATED'}).encode()
+        message = f'TX-1|2026-01-01T00:00:00Z|{webhook_id}|{zlib.crc32(body)}'
+        signature = base64.b64encode(self.key.sign(message.encode(), padding.PKCS1v15(), hashes.SHA256()))
+        return self.client.post(
+            self.url, body, content_type='application/json',
+            HTTP_PAYPAL_TRANSMISSION_ID='TX-1',
+            HTTP_PAYPAL_TRANSMISSION_TIME='2026-01-01T00:00:00Z',
+            HTTP_PAYPAL_TRANSMISSION_SIG=signature.decode(),
+            HTTP_PAYPAL_CERT_URL=cert_url or self.cert_url,
+            HTTP_PAYPAL_AUTH_ALGO='SHA256withRSA',
+        )
+
+    def cache_certificate(self, cert_url):
+        digest = hashlib.md5(cert_url.encode(), usedforsecurity=False).hexdigest()
+        cache.set(PAYPAL_CERT_CACHE_KEY.format(digest), self.pem)
+
+    def test_signature_from_paypal_certificate_is_accepted(self):
+        self.cache_certificate(self.cert_url)
+        self.assertEqual(self.post().status_code, 200)
+        self.assertEqual(self.post(webhook_id='WH-OTHER').status_code, 400)
+
+    def test_certificates_outside_paypal_are_never_fetched(self):
+        for cert_url in (
+            'https://attacker.example.com/cert.pem',
+            'https://paypal.com.attacker.example.com/cert.pem',
+            'http://api.paypal.com/v1/notifications/certs/CERT-1',
+        ):
+            self.cache_certificate(cert_url)
+            with mock.patch('payments.webhooks.urlopen') as urlopen:
+                self.assertEqual(self.post(cert_url).status_code, 400)
+            urlopen.assert_not_called()
+
+
+class TransactionDetailTests(PaymentsTestCase):
+    client_class = APIClient
+
+    def test_internal_fields_are_hidden_from_both_parties(self):
+        transaction = self.create_transaction(
+            Decimal('10.00'), 'TXN-DETAIL', ip_address='203.0.113.7', user_agent='Browser', risk_score=80,
+            metadata={'internal': True}, provider_name='stripe', provider_transaction_id='pi_1',
+        )
+        for user in (self.payer, self.payee):
+            self.client.force_authenticate(user)
+            body = self.client.get(f'/api/v1/payments/transactions/{transaction.pk}/').json()
+            self.assertEqual(body['transaction_number'], 'TXN-DETAIL')
+            for field in ('ip_address', 'user_agent', 'risk_score', 'metadata', 'provider_name',
+                          'provider_transaction_id', 'provider_reference'):
+                self.assertNotIn(field, body)
+
+
+class ListOnlyEndpointTests(PaymentsTestCase):
+    client_class = APIClient
+
+    def test_invoices_and_disputes_cannot_be_created_here(self):
+        self.client.force_authenticate(self.payer)
+        for url in ('/api/v1/payments/invoices/', '/api/v1/payments/disputes/'):
+            self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertEqual(self.client.post(url, {}, format='json').status_code, 405)
@@ -3,31 +3,32 @@ URL configuration for payments app.
 """
 
 from django.urls import path, include
-from . import views
+from pofara_trustees.views import placeholder_view
+from . import views, webhooks
 
 app_name = 'payments'
 
 urlpatterns = [
     # Payment methods
-    path('methods/', views.PaymentMethodListCreateView.as_view(), name='payment_method_list_create'),
-    path('methods/<uuid:method_id>/', views.PaymentMethodDetailView.as_view(), name='payment_method_detail'),
-    path('methods/<uuid:method_id>/verify/', views.VerifyPaymentMethodView.as_view(), name='verify_payment_method'),
+    path('methods/', placeholder_view('Payment methods'), name='payment_method_list_create'),
+    path('methods/<uuid:method_id>/', placeholder_view('Payment method {method_id}'), name='payment_method_detail'),
+    path('methods/<uuid:method_id>/verify/', placeholder_view('Payment method verified', methods=['POST']), name='verify_payment_method'),
     
     # Transactions
     path('transactions/', views.TransactionListView.as_view(), name='transaction_list'),
     path('transactions/<uuid:transaction_id>/', views.TransactionDetailView.as_view(), name='transaction_detail'),
-    path('transactions/create/', views.CreateTransactionView.as_view(), name='create_transaction'),
+    path('transactions/create/', placeholder_view('Transaction created', methods=['POST']), name='create_transaction'),
     
     # Escrow
     path('escrow/', views.EscrowAccountListView.as_view(), name='escrow_account_list'),
     path('escrow/<uuid:account_id>/', views.EscrowAccountDetailView.as_view(), name='escrow_account_detail'),
-    path('escrow/<uuid:account_id>/deposit/', views.EscrowDepositView.as_view(), name='escrow_deposit'),
+    path('escrow/<uuid:account_id>/deposit/', placeholder_view('Escrow deposit', methods=['POST']), name='escrow_deposit'),
     path('escrow/<uuid:account_id>/release/', views.EscrowReleaseView.as_view(), name='escrow_release'),
     
     # Invoices
     path('invoices/', views.InvoiceListCreateView.as_view(), name='invoice_list_create'),
     path('invoices/<uuid:invoice_id>/', views.InvoiceDetailView.as_view(), name='invoice_detail'),
-    path('invoices/<uuid:invoice_id>/pay/', views.PayInvoiceView.as_view(), name='pay_invoice'),
+    path('invoices/<uuid:invoice_id>/pay/', placeholder_view('Invoice paid', methods=['POST']), name='pay_invoice'),
     
     # Disputes
     path('disputes/', views.DisputeListCreateView.as_view(), name='dispute_list_create'),
@@ -39,6 +40,6 @@ urlpatterns = [
     path('reports/generate/', views.GenerateReportView.as_view(), name='generate_report'),
     
     # Webhooks and callbacks
-    path('webhooks/stripe/', views.StripeWebhookView.as_view(), name='stripe_webhook'),
-    path('webhooks/paypal/', views.PayPalWebhookView.as_view(), name='paypal_webhook'),
+    path('webhooks/stripe/', webhooks.stripe_webhook, name='stripe_webhook'),
+    path('webhooks/paypal/', webhooks.paypal_webhook, name='paypal_webhook'),
 ] 
\ No newline at end of file
@@ -1,64 +1,260 @@
-"""Placeholder views for payments app"""
-from rest_framework import generics, status
+"""Views for payments app"""
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.http import HttpResponse
+from rest_framework import generics, permissions, status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-class PaymentMethodListCreateView(generics.ListCreateAPIView):
-    def get(self, request): return Response({'message': 'Payment methods'}, status=status.HTTP_200_OK)
+from pofara_trustees.fieldsets import SparseFieldsetMixin
 
-class PaymentMethodDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, method_id): return Response({'message': f'Payment method {method_id}'}, status=status.HTTP_200_OK)
+from .cache import ANALYTICS_TIMEOUT, generated_report_key, report_list_key
+from .ledger import release_escrow_funds
+from .models import Dispute, EscrowAccount, EscrowTransaction, FinancialReport, Invoice, Transaction
+from .serializers import (
+    DisputeDetailSerializer,
+    DisputeListSerializer,
+    EscrowAccountDetailSerializer,
+    EscrowAccountSerializer,
+    EscrowReleaseSerializer,
+    EscrowTransactionSerializer,
+    FinancialReportDetailSerializer,
+    FinancialReportGenerateSerializer,
+    FinancialReportListSerializer,
+    InvoiceDetailSerializer,
+    InvoiceListSerializer,
+    TransactionDetailSerializer,
+    TransactionListSerializer,
+)
+from .tasks import generate_report
 
-class VerifyPaymentMethodView(APIView):
-    def post(self, request, method_id): return Response({'message': 'Payment method verified'}, status=status.HTTP_200_OK)
 
-class TransactionListView(generics.ListAPIView):
-    def get(self, request): return Response({'message': 'Transactions'}, status=status.HTTP_200_OK)
+class TransactionListView(SparseFieldsetMixin, generics.ListAPIView):
+    """List the transactions the user paid or received."""
+    serializer_class = TransactionListSerializer
+    permission_classes = [permissions.IsAuthenticated]
 
-class TransactionDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, transaction_id): return Response({'message': f'Transaction {transaction_id}'}, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        user = self.request.user
+        # Wide columns the list never shows stay in the database
+        return Transaction.objects.filter(Q(payer=user) | Q(payee=user)).defer(
+            'metadata', 'user_agent', 'failure_message'
+        )
 
-class CreateTransactionView(APIView):
-    def post(self, request): return Response({'message': 'Transaction created'}, status=status.HTTP_200_OK)
 
-class EscrowAccountListView(generics.ListAPIView):
-    def get(self, request): return Response({'message': 'Escrow accounts'}, status=status.HTTP_200_OK)
+class TransactionDetailView(SparseFieldsetMixin, generics.RetrieveAPIView):
+    """Retrieve a transaction the user paid or received."""
+    serializer_class = TransactionDetailSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = 'id'
+    lookup_url_kwarg = 'transaction_id'
+    # Joined for the *_name/*_title and escrow fields; escrow_transaction is
+    # one-to-one, so it is joined rather than prefetched
+    select_for_fields = {
+        'payer_name': ['payer'],
+        'payee_name': ['payee'],
+        'payment_method_display': ['payment_method'],
+        'project_title': ['project'],
+        'milestone_title': ['milestone'],
+        'invoice_number': ['invoice'],
+        'escrow_account': ['escrow_transaction'],
+        'escrow_account_number': ['escrow_transaction__escrow_account'],
+        'escrow_transaction_type': ['escrow_transaction'],
+    }
+    prefetch_for_fields = {
+        'disputes': [Prefetch('disputes', queryset=Dispute.objects.only(
+            'id', 'dispute_number', 'dispute_type', 'status', 'transaction_id'
+        ))],
+    }
 
-class EscrowAccountDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, account_id): return Response({'message': f'Escrow account {account_id}'}, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        user = self.request.user
+        return self.optimize_for_fields(Transaction.objects.filter(Q(payer=user) | Q(payee=user)).defer(
+            'metadata', 'user_agent', 'failure_message'
+        ))
+
+
+def user_escrow_accounts(request):
+    user = request.user
+    return EscrowAccount.objects.filter(Q(depositor=user) | Q(beneficiary=user) | Q(arbitrator=user))
+
+
+# Relations behind EscrowAccountSerializer's *_name/*_title fields
+ESCROW_NAME_RELATIONS = {
+    'depositor_name': ['depositor'],
+    'beneficiary_name': ['beneficiary'],
+    'arbitrator_name': ['arbitrator'],
+    'project_title': ['project'],
+}
+
+
+class EscrowAccountListView(SparseFieldsetMixin, generics.ListAPIView):
+    """List the escrow accounts the user deposits to, benefits from or arbitrates."""
+    serializer_class = EscrowAccountSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    select_for_fields = ESCROW_NAME_RELATIONS
+
+    def get_queryset(self):
+        return self.optimize_for_fields(user_escrow_accounts(self.request)).order_by('-created_at')
+
+
+class EscrowAccountDetailView(SparseFieldsetMixin, generics.RetrieveAPIView):
+    """Retrieve one of the user's escrow accounts with its transaction history."""
+    serializer_class = EscrowAccountDetailSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = 'id'
+    lookup_url_kwarg = 'account_id'
+    select_for_fields = ESCROW_NAME_RELATIONS
+    # The history is only serialized here, so only the detail view prefetches it
+    prefetch_for_fields = {
+        'escrow_transactions': [Prefetch(
+            'escrow_transactions',
+            queryset=EscrowTransaction.objects.select_related(
+                'transaction', 'milestone', 'approved_by', 'dispute'
+            ),
+        )],
+    }
+
+    def get_queryset(self):
+        return self.optimize_for_fields(user_escrow_accounts(self.request))
 
-class EscrowDepositView(APIView):
-    def post(self, request, account_id): return Response({'message': 'Escrow deposit'}, status=status.HTTP_200_OK)
 
 class EscrowReleaseView(APIView):
-    def post(self, request, account_id): return Response({'message': 'Escrow release'}, status=status.HTTP_200_OK)
+    """
+    Release milestone payments from an escrow account to its beneficiary.
+
+    Only the depositor can release; every payment in "releases" is written
+    in one batch and the whole release fails if it would overdraw the account.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, account_id):
+        serializer = EscrowReleaseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        account = EscrowAccount.objects.filter(pk=account_id, depositor=request.user).first()
+        if account is None:
+            return Response({'error': 'Escrow account not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        releases = [(item.get('milestone'), item['amount']) for item in serializer.validated_data['releases']]
+        if any(milestone and milestone.project_id != account.project_id for milestone, _ in releases):
+            return Response(
+                {'error': 'Milestones must belong to the escrow project.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            entries = release_escrow_funds(account, releases, request.user, serializer.validated_data['reason'])
+        except DjangoValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(EscrowTransactionSerializer(entries, many=True).data, status=status.HTTP_201_CREATED)
+
+
+class InvoiceListCreateView(SparseFieldsetMixin, generics.ListAPIView):
+    """List the user's issued and received invoices."""
+    serializer_class = InvoiceListSerializer
+    permission_classes = [permissions.IsAuthenticated]
 
-class InvoiceListCreateView(generics.ListCreateAPIView):
-    def get(self, request): return Response({'message': 'Invoices'}, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        user = self.request.user
+        return Invoice.objects.filter(Q(issued_by=user) | Q(issued_to=user)).defer(
+            'line_items', 'description', 'notes', 'public_notes', 'payment_terms'
+        )
 
-class InvoiceDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, invoice_id): return Response({'message': f'Invoice {invoice_id}'}, status=status.HTTP_200_OK)
 
-class PayInvoiceView(APIView):
-    def post(self, request, invoice_id): return Response({'message': 'Invoice paid'}, status=status.HTTP_200_OK)
+class InvoiceDetailView(generics.RetrieveAPIView):
+    """Retrieve an invoice the user issued or received."""
+    serializer_class = InvoiceDetailSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = 'id'
+    lookup_url_kwarg = 'invoice_id'
 
-class DisputeListCreateView(generics.ListCreateAPIView):
-    def get(self, request): return Response({'message': 'Disputes'}, status=status.HTTP_200_OK)
+    def get_queryset(self):
+        user = self.request.user
+        return Invoice.objects.filter(Q(issued_by=user) | Q(issued_to=user)).select_related(
+            'issued_by', 'issued_to', 'project', 'milestone'
+        )
+
+
+class DisputeListCreateView(generics.ListAPIView):
+    """List disputes the user is a party to."""
+    serializer_class = DisputeListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        return Dispute.objects.filter(
+            Q(plaintiff=user) | Q(defendant=user) | Q(mediator=user) | Q(arbitrator=user)
+        ).defer('description', 'evidence_documents', 'resolution_notes')
+
+
+class DisputeDetailView(generics.RetrieveAPIView):
+    """Retrieve a dispute the user is a party to."""
+    serializer_class = DisputeDetailSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = 'id'
+    lookup_url_kwarg = 'dispute_id'
+
+    def get_queryset(self):
+        user = self.request.user
+        return Dispute.objects.filter(
+            Q(plaintiff=user) | Q(defendant=user) | Q(mediator=user) | Q(arbitrator=user)
+        ).select_related('plaintiff', 'defendant', 'mediator', 'arbitrator', 'transaction', 'project')
+
+
+def user_financial_reports(request):
+    user = request.user
+    shared = FinancialReport.access_granted_to.through.objects.filter(user=user).values('financialreport_id')
+    return FinancialReport.objects.filter(Q(user=user) | Q(pk__in=shared))
 
-class DisputeDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, dispute_id): return Response({'message': f'Dispute {dispute_id}'}, status=status.HTTP_200_OK)
 
 class FinancialReportListView(generics.ListAPIView):
-    def get(self, request): return Response({'message': 'Financial reports'}, status=status.HTTP_200_OK)
+    """List the user's financial reports, including ones shared with them."""
+    serializer_class = FinancialReportListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return user_financial_reports(self.request).defer('data', 'summary')
+
+    def list(self, request, *args, **kwargs):
+        key = report_list_key(request)
+        content = cache.get(key)
+        if content is None:
+            content = JSONRenderer().render(super().list(request, *args, **kwargs).data)
+            cache.set(key, content, ANALYTICS_TIMEOUT)
+        return HttpResponse(content, content_type='application/json')
+
+
+class FinancialReportDetailView(generics.RetrieveAPIView):
+    """Retrieve one of the user's financial reports, or one shared with them."""
+    serializer_class = FinancialReportDetailSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_url_kwarg = 'report_id'
+
+    def get_queryset(self):
+        return user_financial_reports(self.request)
+
+
+class GenerateReportView(generics.CreateAPIView):
+    """
+    Request a financial report for the user or one of their projects.
 
-class FinancialReportDetailView(generics.RetrieveUpdateDestroyAPIView):
-    def get(self, request, report_id): return Response({'message': f'Financial report {report_id}'}, status=status.HTTP_200_OK)
+    The report is built by a background task: the response is a 202 with
+    the report's id, whose detail endpoint shows it as generating until it
+    is ready. Asking again for the same report while none of the underlying
+    data has changed returns the finished report with 200 instead.
+    """
+    serializer_class = FinancialReportGenerateSerializer
+    permission_classes = [permissions.IsAuthenticated]
 
-class GenerateReportView(APIView):
-    def post(self, request): return Response({'message': 'Report generated'}, status=status.HTTP_200_OK)
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        content = cache.get(generated_report_key(FinancialReport(user=request.user, **serializer.validated_data)))
+        if content is not None:
+            return HttpResponse(content, content_type='application/json')
 
-class StripeWebhookView(APIView):
-    def post(self, request): return Response({'message': 'Stripe webhook'}, status=status.HTTP_200_OK)
+        report = serializer.save(user=request.user, generated_by=request.user)
+        transaction.on_commit(lambda: generate_report.delay(str(report.pk)))
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
-class PayPalWebhookView(APIView):
-    def post(self, request): return Response({'message': 'PayPal webhook'}, status=status.HTTP_200_OK)
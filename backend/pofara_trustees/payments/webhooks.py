@@ -0,0 +1,201 @@
+"""
+Payment provider webhooks.
+
+Providers authenticate deliveries by signing them, not with a user token,
+so these are plain async Django views rather than DRF views. Under ASGI a
+delivery that is waiting on outbound I/O (signature or idempotency checks
+against the provider) yields the event loop instead of holding a worker.
+Database work from here goes through the async ORM or sync_to_async.
+
+Signatures cover the raw body, so each view reads request.body once, checks
+the signature over those bytes and only then decodes the JSON event.
+
+Completed payments of one of our invoices (Stripe PaymentIntent
+metadata.invoice_number, PayPal capture invoice_id) are written through
+ledger.record_provider_transactions; replayed deliveries are dropped there.
+Other events are acknowledged and ignored.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+import zlib
+from decimal import Decimal
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+from asgiref.sync import sync_to_async
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .ledger import record_provider_transactions
+from .models import Invoice, Transaction
+
+# Oldest Stripe signature timestamp accepted, in seconds (Stripe's default)
+STRIPE_SIGNATURE_TOLERANCE = 300
+
+# Stripe amounts are in the currency's smallest unit, which for these is the whole unit
+STRIPE_ZERO_DECIMAL_CURRENCIES = frozenset({
+    'bif', 'clp', 'djf', 'gnf', 'jpy', 'kmf', 'krw', 'mga', 'pyg', 'rwf', 'ugx', 'vnd', 'vuv', 'xaf', 'xof', 'xpf',
+})
+
+PAYPAL_CERT_CACHE_KEY = 'paypal:cert:{}'
+PAYPAL_CERT_TIMEOUT = 60 * 60 * 24
+
+
+def _stripe_signature_valid(body, header, secret):
+    """Check a Stripe-Signature header (t=...,v1=...) against the raw body."""
+    if not secret or not header:
+        return False
+    timestamp, signatures = None, []
+    for item in header.split(','):
+        key, _, value = item.strip().partition('=')
+        if key == 't':
+            timestamp = value
+        elif key == 'v1':
+            signatures.append(value)
+    if not timestamp or not timestamp.isdigit() or not signatures:
+        return False
+    if abs(time.time() - int(timestamp)) > STRIPE_SIGNATURE_TOLERANCE:
+        return False
+    expected = hmac.new(secret.encode(), timestamp.encode() + b'.' + body, hashlib.sha256).hexdigest()
+    return any(hmac.compare_digest(expected, signature) for signature in signatures)
+
+
+def _paypal_certificate(cert_url):
+    # PayPal signs with a certificate it publishes under its own domain
+    parts = urlsplit(cert_url)
+    host = parts.hostname or ''
+    if parts.scheme != 'https' or not (host == 'paypal.com' or host.endswith('.paypal.com')):
+        return None
+    key = PAYPAL_CERT_CACHE_KEY.format(hashlib.md5(cert_url.encode(), usedforsecurity=False).hexdigest())
+    pem = cache.get(key)
+    if pem is None:
+        with urlopen(cert_url, timeout=5) as response:
+            pem = response.read()
+        cache.set(key, pem, PAYPAL_CERT_TIMEOUT)
+    return x509.load_pem_x509_certificate(pem)
+
+
+def _paypal_signature_valid(body, headers, webhook_id):
+    """
+    Check PayPal's transmission signature against the raw body.
+
+    PayPal signs "<transmission id>|<transmission time>|<webhook id>|<CRC32
+    of the body>" with SHA256withRSA; the certificate is fetched from the
+    PayPal-Cert-Url header and cached.
+    """
+    transmission_id = headers.get('PayPal-Transmission-Id')
+    transmission_time = headers.get('PayPal-Transmission-Time')
+    signature = headers.get('PayPal-Transmission-Sig')
+    cert_url = headers.get('PayPal-Cert-Url')
+    if not (webhook_id and transmission_id and transmission_time and signature and cert_url):
+        return False
+    if headers.get('PayPal-Auth-Algo', 'SHA256withRSA') != 'SHA256withRSA':
+        return False
+    message = f'{transmission_id}|{transmission_time}|{webhook_id}|{zlib.crc32(body)}'
+    try:
+        certificate = _paypal_certificate(cert_url)
+        if certificate is None:
+            return False
+        certificate.public_key().verify(
+            base64.b64decode(signature), message.encode(), padding.PKCS1v15(), hashes.SHA256()
+        )
+    except (OSError, ValueError, InvalidSignature):
+        return False
+    return True
+
+
+def _event(body):
+    try:
+        event = json.loads(body)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def _stripe_payment(event):
+    """(invoice number, Transaction fields) of a payment_intent.succeeded event, or None."""
+    if event.get('type') != 'payment_intent.succeeded':
+        return None
+    intent = event['data']['object']
+    currency = intent['currency']
+    amount = Decimal(intent['amount_received'])
+    if currency.lower() not in STRIPE_ZERO_DECIMAL_CURRENCIES:
+        amount = amount.scaleb(-2)
+    fields = {'provider_transaction_id': intent['id'], 'currency': currency.upper(), 'amount': amount}
+    return (intent.get('metadata') or {}).get('invoice_number'), fields
+
+
+def _paypal_payment(event):
+    """(invoice number, Transaction fields) of a PAYMENT.CAPTURE.COMPLETED event, or None."""
+    if event.get('event_type') != 'PAYMENT.CAPTURE.COMPLETED':
+        return None
+    capture = event['resource']
+    fee = capture.get('seller_receivable_breakdown', {}).get('paypal_fee', {}).get('value', '0')
+    fields = {
+        'provider_transaction_id': capture['id'],
+        'currency': capture['amount']['currency_code'],
+        'amount': Decimal(capture['amount']['value']),
+        'fee_amount': Decimal(fee),
+    }
+    return capture.get('invoice_id'), fields
+
+
+def _record_invoice_payment(provider_name, payment):
+    """Record a provider payment of one of our invoices; anything else is ignored."""
+    if payment is None:
+        return
+    invoice_number, fields = payment
+    invoice = Invoice.objects.filter(invoice_number=invoice_number).first() if invoice_number else None
+    if invoice is None:
+        return
+    record_provider_transactions(provider_name, [{
+        **fields,
+        'transaction_type': Transaction.TransactionType.PAYMENT,
+        'status': Transaction.Status.COMPLETED,
+        'payer_id': invoice.issued_to_id,
+        'payee_id': invoice.issued_by_id,
+        'project_id': invoice.project_id,
+        'milestone_id': invoice.milestone_id,
+        'invoice_id': invoice.pk,
+        'description': f"Payment of invoice {invoice.invoice_number}",
+        'processed_at': timezone.now(),
+    }])
+
+
+@csrf_exempt
+@require_POST
+async def stripe_webhook(request):
+    body = request.body
+    if not _stripe_signature_valid(body, request.headers.get('Stripe-Signature'), settings.STRIPE_WEBHOOK_SECRET):
+        return HttpResponseBadRequest()
+    event = _event(body)
+    if event is None:
+        return HttpResponseBadRequest()
+    await sync_to_async(_record_invoice_payment)('stripe', _stripe_payment(event))
+    return JsonResponse({'message': 'Stripe webhook'})
+
+
+@csrf_exempt
+@require_POST
+async def paypal_webhook(request):
+    body = request.body
+    valid = await sync_to_async(_paypal_signature_valid, thread_sensitive=False)(
+        body, request.headers, settings.PAYPAL_WEBHOOK_ID
+    )
+    event = _event(body) if valid else None
+    if event is None:
+        return HttpResponseBadRequest()
+    await sync_to_async(_record_invoice_payment)('paypal', _paypal_payment(event))
+    return JsonResponse({'message': 'PayPal webhook'})
@@ -0,0 +1,16 @@
+"""
+Celery application for the pofara_trustees project.
+
+Tasks are discovered from each installed app's tasks module and
+configured from the CELERY_* Django settings.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pofara_trustees.settings')
+
+app = Celery('pofara_trustees')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
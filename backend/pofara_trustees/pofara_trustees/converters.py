@@ -0,0 +1,21 @@
+"""
+URL path converters shared across the Pofara Trustees apps.
+"""
+
+import uuid
+
+
+class FastUUIDConverter:
+    """
+    Lighter variant of Django's uuid converter for hot polling endpoints.
+
+    The regex only narrows the segment down; uuid.UUID does the real
+    validation, and a ValueError from it makes the pattern not match, as
+    with the built-in converter. Both the hyphenated and the bare 32-digit
+    forms are accepted. to_python and to_url are the C-level callables
+    themselves rather than Python methods wrapping them.
+    """
+
+    regex = '[0-9a-f]{32}|[0-9a-f-]{36}'
+    to_python = uuid.UUID
+    to_url = str
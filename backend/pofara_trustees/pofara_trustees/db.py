@@ -0,0 +1,248 @@
+"""
+Database helpers shared across the Pofara Trustees apps.
+"""
+
+import os
+import re
+import time
+import uuid
+from datetime import date
+
+from django.db import migrations, transaction
+from django.utils import timezone
+
+
+class RunPostgresSQL(migrations.RunSQL):
+    """
+    RunSQL operation that only executes on PostgreSQL.
+
+    Used for PostgreSQL-specific DDL (extensions, GIN/BRIN indexes, triggers)
+    so the same migrations still apply cleanly on the SQLite database used
+    in development.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return 'Raw SQL operation (PostgreSQL only)'
+
+
+def bulk_update_safe(queryset, objs, fields, batch_size=500):
+    """
+    bulk_update() in capped batches with PostgreSQL JIT disabled.
+
+    bulk_update() emits one large CASE WHEN per field; on PostgreSQL those
+    statements can spend far longer in JIT compilation than in execution,
+    so JIT is turned off for the enclosing transaction only.
+    """
+    with transaction.atomic(using=queryset.db):
+        connection = transaction.get_connection(queryset.db)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL jit = off')
+        return queryset.bulk_update(objs, fields, batch_size=batch_size)
+
+
+def uuid7():
+    """
+    Return a time-ordered UUID (RFC 9562 version 7).
+
+    The leading 48 bits are the Unix time in milliseconds, so new primary
+    keys land at the right-hand edge of the B-tree instead of on random
+    pages as uuid4 keys do.
+    """
+    unix_ms = time.time_ns() // 1_000_000
+    value = (unix_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
+def _add_months(day, months):
+    """First day of the month `months` after the month containing `day`."""
+    years, month = divmod(day.month - 1 + months, 12)
+    return day.replace(year=day.year + years, month=month + 1, day=1)
+
+
+def _default_partition(cursor, table):
+    """Name and partition key column of `table`'s DEFAULT partition, or None."""
+    cursor.execute(
+        'SELECT d.relname, a.attname FROM pg_partitioned_table p '
+        'JOIN pg_class d ON d.oid = p.partdefid '
+        'JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0] '
+        'WHERE p.partrelid = %s::regclass',
+        [table],
+    )
+    return cursor.fetchone()
+
+
+def _default_holds_rows(cursor, partition, default, lower, upper):
+    """Whether `partition` is still missing and the DEFAULT one has rows for it."""
+    cursor.execute('SELECT to_regclass(%s)', [partition])
+    if cursor.fetchone()[0] is not None:
+        return False
+    qn = cursor.db.ops.quote_name
+    default_table, column = default
+    cursor.execute(
+        f'SELECT 1 FROM {qn(default_table)} WHERE {qn(column)} >= %s AND {qn(column)} < %s LIMIT 1',
+        [lower, upper],
+    )
+    return cursor.fetchone() is not None
+
+
+def create_monthly_partitions(connection, table, start, months):
+    """
+    Create the monthly range partitions of `table` for `months` months
+    from the month containing `start`; existing partitions are kept.
+
+    Rows for a new month already sitting in the DEFAULT partition would
+    make CREATE fail, so those are moved: the DEFAULT partition is
+    detached, the month's partition created, the rows moved across and
+    the DEFAULT partition attached again, all in one transaction.
+
+    Partitions are named <table>_pYYYYMM. No-op outside PostgreSQL.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    qn = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        default = _default_partition(cursor, table)
+        for offset in range(months):
+            lower = _add_months(start, offset)
+            upper = _add_months(lower, 1)
+            name = f'{table}_p{lower:%Y%m}'
+            create = (
+                f'CREATE TABLE IF NOT EXISTS {qn(name)} PARTITION OF {qn(table)} '
+                f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            if default is None or not _default_holds_rows(cursor, name, default, lower, upper):
+                cursor.execute(create)
+                continue
+
+            default_table, column = default
+            in_month = f'{qn(column)} >= %s AND {qn(column)} < %s'
+            cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(default_table)}')
+            cursor.execute(create)
+            cursor.execute(
+                f'INSERT INTO {qn(table)} SELECT * FROM {qn(default_table)} WHERE {in_month}', [lower, upper]
+            )
+            cursor.execute(f'DELETE FROM {qn(default_table)} WHERE {in_month}', [lower, upper])
+            cursor.execute(f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(default_table)} DEFAULT')
+
+
+def drop_monthly_partitions_before(connection, table, cutoff):
+    """
+    Drop the monthly partitions of `table` that only hold rows older than
+    `cutoff` (a date), returning how many were dropped.
+
+    Dropping a whole partition avoids the dead tuples and vacuum work of a
+    bulk DELETE. No-op outside PostgreSQL.
+    """
+    if connection.vendor != 'postgresql':
+        return 0
+    qn = connection.ops.quote_name
+    pattern = re.compile(rf'^{re.escape(table)}_p(\d{{4}})(\d{{2}})$')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = %s::regclass',
+            [table],
+        )
+        partitions = [row[0] for row in cursor.fetchall()]
+        dropped = 0
+        for name in partitions:
+            match = pattern.match(name)
+            if not match:
+                continue
+            lower = date(int(match[1]), int(match[2]), 1)
+            if _add_months(lower, 1) <= cutoff:
+                cursor.execute(f'DROP TABLE {qn(name)}')
+                dropped += 1
+    return dropped
+
+
+def _rebuild_table(schema_editor, table, primary_key, partition_column=None, months_ahead=3):
+    """
+    Recreate `table` with its rows, indexes and foreign keys, optionally
+    as a table range-partitioned by month on `partition_column`.
+
+    PostgreSQL requires the partition column in the primary key, so
+    `primary_key` lists the key columns to use for the new table.
+    """
+    connection = schema_editor.connection
+    qn = connection.ops.quote_name
+    old_table = f'{table}_old'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s',
+            [table, f'{table}_pkey'],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, primary_key[0]])
+        sequence = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(old_table)}')
+        partition_clause = f' PARTITION BY RANGE ({qn(partition_column)})' if partition_column else ''
+        cursor.execute(
+            f'CREATE TABLE {qn(table)} (LIKE {qn(old_table)} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS)'
+            f'{partition_clause}'
+        )
+
+    if partition_column:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT MIN({qn(partition_column)}) FROM {qn(old_table)}')
+            oldest = cursor.fetchone()[0]
+        today = timezone.now().date()
+        start = oldest.date() if oldest else today
+        months = (today.year - start.year) * 12 + today.month - start.month + months_ahead + 1
+        create_monthly_partitions(connection, table, start, months)
+        with connection.cursor() as cursor:
+            # Safety net for rows outside the pre-created months
+            cursor.execute(f'CREATE TABLE {qn(f"{table}_default")} PARTITION OF {qn(table)} DEFAULT')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(old_table)}')
+        cursor.execute(f'DROP TABLE {qn(old_table)}')
+        key = ', '.join(qn(column) for column in primary_key)
+        cursor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(f"{table}_pkey")} PRIMARY KEY ({key})')
+        for _, indexdef in indexes:
+            cursor.execute(indexdef)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}')
+        if sequence:
+            cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, primary_key[0]])
+            new_sequence = cursor.fetchone()[0]
+            cursor.execute(
+                f'SELECT setval(%s, COALESCE(MAX({qn(primary_key[0])}), 0) + 1, false) FROM {qn(table)}',
+                [new_sequence],
+            )
+            if new_sequence != sequence:
+                cursor.execute(f'ALTER SEQUENCE {new_sequence} RENAME TO {qn(sequence.split(".")[-1])}')
+
+
+def partition_table_by_month(schema_editor, table, column, pk='id', months_ahead=3):
+    """
+    Convert `table` into a table range-partitioned by month on `column`,
+    for use from a RunPython migration. No-op outside PostgreSQL.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        _rebuild_table(schema_editor, table, [pk, column], column, months_ahead)
+
+
+def unpartition_table(schema_editor, table, pk='id'):
+    """Reverse of partition_table_by_month(). No-op outside PostgreSQL."""
+    if schema_editor.connection.vendor == 'postgresql':
+        _rebuild_table(schema_editor, table, [pk])
@@ -0,0 +1,54 @@
+"""
+Sparse fieldsets for DRF generic views.
+
+A GET with ?fields=a,b serializes only those fields, and the queryset joins
+or prefetches only the relations those fields read. Without ?fields every
+field is serialized and every mapped relation is loaded.
+"""
+
+
+class SparseFieldsetMixin:
+    """
+    Mix into a generic view ahead of the DRF base class.
+
+    select_for_fields maps a serializer field to the select_related paths
+    it reads; prefetch_for_fields maps one to prefetch_related lookups
+    (strings or Prefetch objects). Unknown names in ?fields are ignored.
+    """
+    fields_param = 'fields'
+    select_for_fields = {}
+    prefetch_for_fields = {}
+
+    def requested_fields(self):
+        if self.request.method != 'GET':
+            return None
+        value = self.request.query_params.get(self.fields_param)
+        if not value:
+            return None
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+    def optimize_for_fields(self, queryset):
+        requested = self.requested_fields()
+        select = [
+            path for field, paths in self.select_for_fields.items()
+            if requested is None or field in requested for path in paths
+        ]
+        prefetch = [
+            lookup for field, lookups in self.prefetch_for_fields.items()
+            if requested is None or field in requested for lookup in lookups
+        ]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        requested = self.requested_fields()
+        if requested is not None:
+            fields = serializer.child.fields if kwargs.get('many') else serializer.fields
+            for name in list(fields):
+                if name not in requested:
+                    fields.pop(name)
+        return serializer
@@ -3,6 +3,7 @@ Django settings for pofara_trustees project.
 Production-ready configuration with environment variables and security best practices.
 """
 
+import importlib.util
 import os
 from pathlib import Path
 from datetime import timedelta
@@ -52,7 +53,6 @@ THIRD_PARTY_APPS = [
     'django_filters',
     'guardian',
     'phonenumber_field',
-    'drf_spectacular',
 ]
 
 LOCAL_APPS = [
@@ -65,12 +65,21 @@ LOCAL_APPS = [
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
-# Development apps
+# API documentation (drf_spectacular), off by default outside development
+ENABLE_API_DOCS = env.bool('ENABLE_API_DOCS', default=DEBUG)
+if ENABLE_API_DOCS:
+    INSTALLED_APPS += ['drf_spectacular']
+
+# Development apps; the toolbar only where it's installed (urls.py checks the same flag)
+DEBUG_TOOLBAR = DEBUG and importlib.util.find_spec('debug_toolbar') is not None
 if DEBUG:
-    INSTALLED_APPS += ['django_extensions', 'debug_toolbar']
+    INSTALLED_APPS += ['django_extensions']
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS += ['debug_toolbar']
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'accounts.middleware.ClientIPMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -82,7 +91,7 @@ MIDDLEWARE = [
 ]
 
 # Development middleware
-if DEBUG:
+if DEBUG_TOOLBAR:
     MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
 
 ROOT_URLCONF = 'pofara_trustees.urls'
@@ -110,6 +119,20 @@ DATABASES = {
     'default': env.db(default='sqlite:///' + str(BASE_DIR / 'db.sqlite3'))
 }
 
+# PostgreSQL connection pooling (psycopg 3). Each worker process keeps up to
+# DB_POOL_MAX_SIZE connections open instead of connecting per request. When
+# running behind PgBouncer in transaction mode, set DB_POOL_MAX_SIZE=0 and
+# DB_DISABLE_SERVER_SIDE_CURSORS=True instead.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = env.bool('DB_DISABLE_SERVER_SIDE_CURSORS', default=False)
+    DB_POOL_MAX_SIZE = env.int('DB_POOL_MAX_SIZE', default=25)
+    if DB_POOL_MAX_SIZE:
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': env.int('DB_POOL_TIMEOUT', default=10),
+        }
+
 # Cache Configuration
 if env('REDIS_URL', default=None):
     CACHES = {
@@ -157,9 +180,30 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Rate limiting (django-ratelimit)
+RATELIMIT_ENABLE = env('RATELIMIT_ENABLE')
+
+# Reverse proxies (addresses or networks) whose X-Forwarded-For is trusted
+# when resolving the client IP; with none, REMOTE_ADDR is the client
+TRUSTED_PROXIES = env.list('TRUSTED_PROXIES', default=[])
+
+# Password hashing (Argon2id first; PBKDF2 kept so existing hashes still verify
+# and are upgraded on the next successful login)
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -181,7 +225,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.JWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -189,6 +233,9 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
+    # OPTIONS gets a 405 instead of metadata built from the serializers;
+    # CORS preflights are answered by corsheaders before reaching a view
+    'DEFAULT_METADATA_CLASS': None,
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
         'rest_framework.parsers.MultiPartParser',
@@ -201,8 +248,10 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
+if ENABLE_API_DOCS:
+    # DRF's own default otherwise, as drf_spectacular isn't installed
+    REST_FRAMEWORK['DEFAULT_SCHEMA_CLASS'] = 'drf_spectacular.openapi.AutoSchema'
 
 # JWT Configuration
 SIMPLE_JWT = {
@@ -220,6 +269,8 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'accounts.serializers.TokenVerifySerializer',
 }
 
 # CORS Configuration
@@ -247,6 +298,10 @@ EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = env('EMAIL_HOST_USER', default='noreply@pofara-trustees.com')
 
+# Payment provider webhooks
+STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET', default='')
+PAYPAL_WEBHOOK_ID = env('PAYPAL_WEBHOOK_ID', default='')
+
 # Celery Configuration
 CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='redis://localhost:6379/1')
 CELERY_RESULT_BACKEND = env('CELERY_RESULT_BACKEND', default='redis://localhost:6379/1')
@@ -254,6 +309,22 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Without Redis (local development) tasks run inline instead of queueing
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', default=not env('REDIS_URL', default=None))
+CELERY_BEAT_SCHEDULE = {
+    'flush-login-attempts': {
+        'task': 'accounts.tasks.flush_login_attempts',
+        'schedule': 30.0,
+    },
+    'maintain-login-attempt-partitions': {
+        'task': 'accounts.tasks.maintain_login_attempt_partitions',
+        'schedule': 60.0 * 60 * 24,
+    },
+    'maintain-notification-partitions': {
+        'task': 'messaging.tasks.maintain_notification_partitions',
+        'schedule': 60.0 * 60 * 24,
+    },
+}
 
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = env('MAX_FILE_SIZE')
@@ -269,6 +340,12 @@ SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
 
+# OpenAPI schema generated at build time (manage.py spectacular --file
+# staticfiles/schema.yml, after collectstatic) and served as a static file.
+# Without it, /api/schema/ falls back to generating the schema per request.
+API_SCHEMA_FILE = STATIC_ROOT / 'schema.yml'
+API_SCHEMA_URL = STATIC_URL + 'schema.yml'
+
 # Guardian Configuration
 GUARDIAN_RENDER_403 = True
 GUARDIAN_TEMPLATE_403 = '403.html'
@@ -4,12 +4,8 @@ URL configuration for pofara_trustees project.
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
+from django.views.generic import RedirectView
 from django.conf.urls.static import static
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
 
 # API URL patterns
 api_v1_patterns = [
@@ -20,32 +16,55 @@ api_v1_patterns = [
     path('payments/', include('payments.urls')),
 ]
 
+# API Documentation, imported only where it's enabled so other workers
+# never load drf_spectacular (settings only installs the app then too)
+docs_patterns = []
+if settings.ENABLE_API_DOCS:
+    from drf_spectacular.views import (
+        SpectacularAPIView,
+        SpectacularRedocView,
+        SpectacularSwaggerView,
+    )
+
+    # Serve the schema built at deploy time when there is one
+    if settings.API_SCHEMA_FILE.exists():
+        schema_view = RedirectView.as_view(url=settings.API_SCHEMA_URL)
+        schema_url = {'url': settings.API_SCHEMA_URL}
+    else:
+        schema_view = SpectacularAPIView.as_view()
+        schema_url = {'url_name': 'schema'}
+    docs_patterns = [
+        path('api/schema/', schema_view, name='schema'),
+        path('api/docs/', SpectacularSwaggerView.as_view(**schema_url), name='swagger-ui'),
+        path('api/redoc/', SpectacularRedocView.as_view(**schema_url), name='redoc'),
+    ]
+
+# Debug toolbar and media/static files in development
+debug_patterns = []
+dev_file_patterns = []
+if settings.DEBUG_TOOLBAR:
+    debug_patterns = [path('__debug__/', include('debug_toolbar.urls'))]
+if settings.DEBUG:
+    dev_file_patterns = [
+        *static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT),
+        *static(settings.STATIC_URL, document_root=settings.STATIC_ROOT),
+    ]
+
 urlpatterns = [
+    *debug_patterns,
+    
     # Admin
     path('admin/', admin.site.urls),
     
-    # API Documentation
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
-    
     # API v1
     path('api/v1/', include(api_v1_patterns)),
     
     # Health check endpoint (placeholder)
     # path('health/', include('django_extensions.urls')),
-]
-
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     
-    # Debug toolbar
-    import debug_toolbar
-    urlpatterns = [
-        path('__debug__/', include(debug_toolbar.urls)),
-    ] + urlpatterns
+    *docs_patterns,
+    *dev_file_patterns,
+]
 
 # Custom error handlers (commented out for now)
 # handler400 = 'pofara_trustees.views.bad_request'
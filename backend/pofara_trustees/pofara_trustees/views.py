@@ -0,0 +1,118 @@
+"""
+Project-level views shared across the Pofara Trustees apps.
+"""
+
+import json
+from string import Formatter
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, permissions, status
+from rest_framework.settings import api_settings
+
+
+def _authenticate(request):
+    """
+    Run the configured DRF authenticators against a plain HttpRequest.
+
+    Returns the authenticator that rejected the credentials, or None once
+    request.user is set (AnonymousUser when no credentials were sent).
+    """
+    for authenticator_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        authenticator = authenticator_class()
+        try:
+            result = authenticator.authenticate(request)
+        except exceptions.AuthenticationFailed:
+            return authenticator
+        if result is not None:
+            request.user, request.auth = result
+            return None
+    request.user, request.auth = AnonymousUser(), None
+    return None
+
+
+def _error(detail, status_code, authenticate_header=None):
+    response = JsonResponse({'detail': str(detail)}, status=status_code)
+    if authenticate_header:
+        response['WWW-Authenticate'] = authenticate_header
+    return response
+
+
+def _byte_template(message):
+    """
+    Compile a message with {name} fields into a JSON body byte template.
+
+    Returns the %-style bytes template and its field names (the finished
+    body when there are none), or None when a field uses attribute access,
+    indexing, a conversion or a format spec.
+    """
+    literal_parts, names = [], []
+    for literal, field, format_spec, conversion in Formatter().parse(message):
+        literal_parts.append(literal.replace('%', '%%'))
+        if field is None:
+            continue
+        if not field.isidentifier() or format_spec or conversion:
+            return None
+        literal_parts.append('%s')
+        names.append(field)
+    template = json.dumps({'message': ''.join(literal_parts)}).encode()
+    return (template if names else template % ()), names
+
+
+def placeholder_view(message, methods=('GET',), permission=permissions.IsAuthenticated):
+    """
+    Build a lightweight view for an endpoint that is not implemented yet.
+
+    The view returns {'message': message} as JSON, with URL kwargs
+    substituted into the message. It keeps the API's authentication and
+    permission rules but skips DRF's dispatch, content negotiation and
+    parsers, which a static response does not need. The message is
+    compiled to a bytes template once here, so a request only %-formats
+    its JSON-escaped URL kwargs into it.
+    """
+    if 'GET' in methods and 'HEAD' not in methods:
+        # As with Django's and DRF's views, HEAD is answered like GET
+        methods = (*methods, 'HEAD')
+    allowed = ', '.join(methods)
+    compiled = _byte_template(message)
+
+    @csrf_exempt
+    def view(request, **kwargs):
+        if request.method not in methods:
+            response = _error(
+                exceptions.MethodNotAllowed.default_detail.format(method=request.method),
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+            )
+            response['Allow'] = allowed
+            return response
+
+        failed_authenticator = _authenticate(request)
+        if failed_authenticator is not None:
+            return _error(
+                exceptions.AuthenticationFailed.default_detail,
+                status.HTTP_401_UNAUTHORIZED,
+                failed_authenticator.authenticate_header(request),
+            )
+
+        check = permission()
+        if not check.has_permission(request, None):
+            if request.auth is None and not request.user.is_authenticated:
+                return _error(
+                    exceptions.NotAuthenticated.default_detail,
+                    status.HTTP_401_UNAUTHORIZED,
+                    api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]().authenticate_header(request),
+                )
+            return _error(
+                getattr(check, 'message', None) or exceptions.PermissionDenied.default_detail,
+                status.HTTP_403_FORBIDDEN,
+            )
+
+        if compiled is None:
+            return JsonResponse({'message': message.format(**kwargs)})
+        body, names = compiled
+        if names:
+            body %= tuple(json.dumps(str(kwargs[name]))[1:-1].encode() for name in names)
+        return HttpResponse(body, content_type='application/json')
+
+    return view